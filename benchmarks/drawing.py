@@ -0,0 +1,171 @@
+""" Measure drawing speed, export time, and memory for typical turtle scripts.
+
+Each scenario draws on a new turtle, then exports the drawing with to_svg()
+and save_as(). The results show steps per second for the drawing, seconds
+for each export, and the peak memory that tracemalloc saw. Save the results
+with --save, and compare a later run against them with --compare.
+"""
+import json
+import tempfile
+import time
+import tracemalloc
+import typing
+from argparse import ArgumentParser
+from pathlib import Path
+
+from svg_turtle import FastSvgTurtle, SvgTurtle
+
+
+def long_walk(t, steps):
+    for i in range(steps):
+        t.forward(3)
+        t.left(7 + i % 5)
+
+
+def dashes(t, steps):
+    for i in range(steps):
+        if i % 2:
+            t.penup()
+        else:
+            t.pendown()
+        t.forward(4)
+        t.left(3)
+
+
+def stamps_and_dots(t, steps):
+    t.penup()
+    for i in range(steps):
+        t.forward(5)
+        t.left(11)
+        if i % 2:
+            t.stamp()
+        else:
+            t.dot(5, 'red')
+
+
+def filled_polygons(t, steps):
+    t.fillcolor('blue')
+    for _ in range(steps // 6):
+        t.begin_fill()
+        for _ in range(5):
+            t.forward(20)
+            t.left(72)
+        t.end_fill()
+        t.right(13)
+
+
+def writing(t, steps):
+    t.penup()
+    for i in range(steps):
+        t.write(f'Line {i}', align='center')
+        t.forward(2)
+        t.left(5)
+
+
+def colour_spiral(t, steps):
+    for i in range(steps):
+        t.pencolor(0, 0.05*(i % 20), 0)
+        t.width(i % 20)
+        t.forward(50 + (i % 20)**2 * 1.5)
+        t.right(144)
+
+
+SCENARIOS = dict(long_walk=long_walk,
+                 dashes=dashes,
+                 stamps_and_dots=stamps_and_dots,
+                 filled_polygons=filled_polygons,
+                 writing=writing,
+                 colour_spiral=colour_spiral)
+TURTLE_CLASSES = dict(svg=SvgTurtle, fast=FastSvgTurtle)
+
+
+def measure(turtle_class,
+            scenario,
+            steps: int,
+            folder: Path) -> typing.Dict[str, float]:
+    """ Run a scenario twice: once for timing, and once to trace memory. """
+    start = time.perf_counter()
+    t = turtle_class(1000, 1000)
+    scenario(t, steps)
+    draw_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    svg = t.to_svg()
+    to_svg_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    t.save_as(folder / 'benchmark.svg')
+    save_as_time = time.perf_counter() - start
+    del t
+
+    # Tracing slows everything down, so it gets a separate run.
+    tracemalloc.start()
+    try:
+        t = turtle_class(1000, 1000)
+        scenario(t, steps)
+        t.save_as(folder / 'benchmark.svg')
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return dict(steps_per_second=steps / draw_time,
+                to_svg_seconds=to_svg_time,
+                save_as_seconds=save_as_time,
+                peak_mb=peak / 1e6,
+                svg_kb=len(svg) / 1e3)
+
+
+def main():
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument('--steps', type=int, default=10_000)
+    parser.add_argument('--turtle',
+                        choices=sorted(TURTLE_CLASSES),
+                        action='append',
+                        help='turtle class to measure, default is all')
+    parser.add_argument('--scenario',
+                        choices=sorted(SCENARIOS),
+                        action='append',
+                        help='scenario to run, default is all')
+    parser.add_argument('--save', type=Path, help='JSON file to write')
+    parser.add_argument('--compare', type=Path, help='JSON file to compare')
+    args = parser.parse_args()
+
+    turtle_names = args.turtle or list(TURTLE_CLASSES)
+    scenario_names = args.scenario or list(SCENARIOS)
+    old_results = {}
+    if args.compare is not None:
+        old_results = json.loads(args.compare.read_text())
+
+    print(f'{"scenario":<16} {"turtle":<6} {"steps/s":>10} {"to_svg s":>9} '
+          f'{"save_as s":>9} {"peak MB":>8} {"SVG kB":>8}')
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        # Warm up, so the lazy imports aren't counted in the first scenario.
+        for scenario in SCENARIOS.values():
+            measure(SvgTurtle, scenario, 100, Path(folder))
+        for scenario_name in scenario_names:
+            for turtle_name in turtle_names:
+                key = f'{scenario_name}/{turtle_name}'
+                result = measure(TURTLE_CLASSES[turtle_name],
+                                 SCENARIOS[scenario_name],
+                                 args.steps,
+                                 Path(folder))
+                results[key] = result
+                print(f'{scenario_name:<16} {turtle_name:<6} '
+                      f'{result["steps_per_second"]:10.0f} '
+                      f'{result["to_svg_seconds"]:9.3f} '
+                      f'{result["save_as_seconds"]:9.3f} '
+                      f'{result["peak_mb"]:8.1f} '
+                      f'{result["svg_kb"]:8.0f}')
+                old_result = old_results.get(key)
+                if old_result is not None:
+                    changes = ' '.join(
+                        f'{name} {result[name]/old_value - 1:+.0%}'
+                        for name, old_value in old_result.items()
+                        if old_value)
+                    print(f'{"":<16} {"":<6} change: {changes}')
+    if args.save is not None:
+        args.save.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
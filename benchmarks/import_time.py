@@ -0,0 +1,64 @@
+""" Measure how long it takes to import svg_turtle, with python -X importtime.
+
+Each statement runs several times in a fresh interpreter, and the median
+import time is reported in milliseconds, after subtracting the imports that
+an empty interpreter does at start up. Pass --limit to fail when importing
+the package takes longer than that.
+"""
+import re
+import subprocess
+import sys
+from argparse import ArgumentParser
+from statistics import median
+
+STATEMENTS = ('import svg_turtle',
+              'from svg_turtle import SvgTurtle',
+              'from svg_turtle import FastSvgTurtle',
+              'from svg_turtle import SvgTurtle; SvgTurtle().to_svg()')
+IMPORT_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)')
+
+
+def measure(statement: str) -> float:
+    """ Total top-level import time for a statement, in milliseconds. """
+    result = subprocess.run([sys.executable,
+                             '-X',
+                             'importtime',
+                             '-c',
+                             statement],
+                            stderr=subprocess.PIPE,
+                            check=True,
+                            text=True)
+    total = 0
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match and not match.group(3):
+            # Only count top-level imports, because they include the others.
+            total += int(match.group(2))
+    return total / 1000
+
+
+def main():
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--limit',
+                        type=float,
+                        help='maximum milliseconds for import svg_turtle')
+    args = parser.parse_args()
+
+    # The first run compiles any changed modules, so don't count it.
+    measure(STATEMENTS[0])
+    start_time = median(measure('pass') for _ in range(args.repeat))
+    package_time = None
+    for statement in STATEMENTS:
+        times = [measure(statement) for _ in range(args.repeat)]
+        statement_time = median(times) - start_time
+        if package_time is None:
+            package_time = statement_time
+        print(f'{statement_time:8.1f} ms  {statement}')
+    if args.limit is not None and package_time > args.limit:
+        print(f'Importing svg_turtle took longer than {args.limit} ms.')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
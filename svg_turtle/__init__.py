@@ -1,7 +1,31 @@
 # noinspection PyUnresolvedReferences
 from .about import __title__, __version__, __url__
 
-# Importing TurtleGraphicsError directly from turtle will fail without tkinter.
-# noinspection PyUnresolvedReferences
-from .svg_turtle import SvgTurtle, TurtleGraphicsError
-from .ipython_turtle import IPythonTurtle
\ No newline at end of file
+# The turtle classes import Tkinter, the turtle module, and maybe IPython,
+# which are slow, so only import each one when someone asks for it.
+_lazy_names = dict(SvgTurtle='.svg_turtle',
+                   TurtleGraphicsError='.svg_turtle',
+                   FastSvgTurtle='.fast_turtle',
+                   IPythonTurtle='.ipython_turtle')
+# Star imports look these up through __getattr__().
+__all__ = ['SvgTurtle',
+           'TurtleGraphicsError',
+           'FastSvgTurtle',
+           'IPythonTurtle']
+
+
+def __getattr__(name):
+    module_name = _lazy_names.get(name)
+    if module_name is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    from importlib import import_module
+
+    # Importing TurtleGraphicsError directly from turtle will fail without
+    # tkinter, so it comes from svg_turtle, after the tkinter set up.
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_lazy_names))
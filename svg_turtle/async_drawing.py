@@ -0,0 +1,134 @@
+import asyncio
+import threading
+import typing
+
+from .batch import Job, draw_job
+from .stats import MISSING
+from .svg_turtle import SvgTurtle
+
+DEFAULT_STEPS_PER_PAUSE = 200
+
+
+async def draw_async(job: Job,
+                     width: int = 400,
+                     height: int = 250,
+                     steps_per_pause: int = DEFAULT_STEPS_PER_PAUSE,
+                     turtle=None):
+    """ Draw a job, and let other tasks run every few turtle steps.
+
+    The job runs in a helper thread, but only while the event loop waits
+    for it, so it never runs at the same time as other tasks. A job that
+    neither moves nor turns for a long time still blocks the event loop.
+    :param job: a function that takes the turtle, or script text that
+        draws with a turtle named t
+    :param width: the width of a new turtle's drawing
+    :param height: the height of a new turtle's drawing
+    :param steps_per_pause: how many moves and turns to draw before letting
+        other tasks run
+    :param turtle: the turtle to draw with, like a FastSvgTurtle, or None
+        for a new SvgTurtle
+    :return: the turtle, after the job finishes
+    """
+    if turtle is None:
+        turtle = SvgTurtle(width, height)
+    drawing = SteppedDrawing(job, turtle, steps_per_pause)
+    try:
+        while drawing.run_steps():
+            await asyncio.sleep(0)
+    except BaseException:
+        drawing.cancel()
+        raise
+    finally:
+        drawing.unwrap()
+    return turtle
+
+
+class SteppedDrawing:
+    """ Run a drawing job in a helper thread, a few steps at a time.
+
+    The thread and its caller take turns: run_steps() blocks until the job
+    has made steps_per_pause moves and turns, and then the job blocks until
+    the next call to run_steps().
+    """
+    def __init__(self, job: Job, turtle, steps_per_pause: int):
+        self.job = job
+        self.turtle = turtle
+        self.steps_per_pause = steps_per_pause
+        self.steps_left = steps_per_pause
+        self.thread: typing.Optional[threading.Thread] = None
+        self.resumed = threading.Semaphore(0)
+        self.paused = threading.Semaphore(0)
+        self.is_finished = False
+        self.is_cancelled = False
+        self.error: typing.Optional[BaseException] = None
+        self.wrapped: typing.List[typing.Tuple[str, object]] = []
+        for method_name in ('_goto', '_rotate'):
+            self.wrap(method_name)
+
+    def wrap(self, method_name: str):
+        """ Count calls to one of the turtle's methods as steps. """
+        turtle = self.turtle
+        original = vars(turtle).get(method_name, MISSING)
+        method = getattr(turtle, method_name)
+
+        def wrapper(*args, **kwargs):
+            self.steps_left -= 1
+            if self.steps_left <= 0:
+                self.pause()
+            return method(*args, **kwargs)
+        setattr(turtle, method_name, wrapper)
+        self.wrapped.append((method_name, original))
+
+    def unwrap(self):
+        """ Restore the turtle methods that wrap() replaced. """
+        for method_name, original in reversed(self.wrapped):
+            if original is MISSING:
+                delattr(self.turtle, method_name)
+            else:
+                setattr(self.turtle, method_name, original)
+        self.wrapped.clear()
+
+    def run_steps(self) -> bool:
+        """ Let the job run until its next pause.
+
+        Any error from the job is raised here.
+        :return: True if the job paused, or False if it finished
+        """
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run_job, daemon=True)
+            self.thread.start()
+        else:
+            self.resumed.release()
+        self.paused.acquire()
+        if not self.is_finished:
+            return True
+        if self.error is not None:
+            raise self.error
+        return False
+
+    def run_job(self):
+        try:
+            draw_job(self.job, self.turtle)
+        except BaseException as ex:
+            self.error = ex
+        finally:
+            self.is_finished = True
+            self.paused.release()
+
+    def pause(self):
+        """ Called in the job's thread to wait for the next run_steps(). """
+        if self.is_finished:
+            # Something kept a wrapped method after the job finished.
+            return
+        self.steps_left = self.steps_per_pause
+        self.paused.release()
+        self.resumed.acquire()
+        if self.is_cancelled:
+            raise asyncio.CancelledError()
+
+    def cancel(self):
+        """ Stop the job at its next pause, and wait for it to finish. """
+        self.is_cancelled = True
+        while self.thread is not None and not self.is_finished:
+            self.resumed.release()
+            self.paused.acquire()
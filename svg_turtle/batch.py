@@ -0,0 +1,137 @@
+import os
+import time
+import traceback
+import typing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+
+from .svg_turtle import SvgTurtle
+
+# A drawing function that takes a turtle, or script text that draws with t.
+Job = typing.Union[typing.Callable[[SvgTurtle], typing.Any], str]
+
+
+@dataclass
+class BatchResult:
+    """ What happened to one job in a batch.
+
+    :param name: the job's name, also used for its file name
+    :param path: the file that was written, or None if the job failed
+    :param seconds: wall time to draw and save the job
+    :param error: the traceback, if the job failed
+    """
+    name: str
+    path: typing.Optional[Path]
+    seconds: float
+    error: typing.Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def run_job(job: Job, width: int = 400, height: int = 250) -> SvgTurtle:
+    """ Draw a single job on a new turtle, and return the turtle.
+
+    :param job: a function that takes the turtle, or script text that
+        draws with a turtle named t
+    """
+    t = SvgTurtle(width, height)
+    draw_job(job, t)
+    return t
+
+
+def draw_job(job: Job, t):
+    """ Draw a single job on an existing turtle.
+
+    :param job: a function that takes the turtle, or script text that
+        draws with a turtle named t
+    :param t: the turtle to draw with
+    """
+    if isinstance(job, str):
+        exec(job, dict(t=t, SvgTurtle=SvgTurtle))
+    else:
+        job(t)
+
+
+def render_job(name: str,
+               job: Job,
+               path: Path,
+               width: int = 400,
+               height: int = 250,
+               options: dict = None) -> BatchResult:
+    """ Draw a single job, and save it as a file, recording any error. """
+    start = time.perf_counter()
+    try:
+        t = run_job(job, width, height)
+        t.save_as(path, **(options or {}))
+    except Exception:
+        return BatchResult(name,
+                           None,
+                           time.perf_counter() - start,
+                           traceback.format_exc())
+    return BatchResult(name, path, time.perf_counter() - start)
+
+
+def render_many(jobs: typing.Union[typing.Mapping[str, Job],
+                                   typing.Iterable[Job]],
+                out_dir,
+                workers: int = None,
+                width: int = 400,
+                height: int = 250,
+                suffix: str = '.svg',
+                callback: typing.Callable[[BatchResult], typing.Any] = None,
+                **options) -> typing.List[BatchResult]:
+    """ Render independent drawings, each on its own turtle, to files.
+
+    Each worker process draws a job and saves it to out_dir, so only the
+    timing and any error come back to this process. Failed jobs don't stop
+    the batch.
+    :param jobs: drawing functions or script text, either as a dict keyed
+        by file name, or as a sequence named job0000, job0001, and so on.
+        Functions have to be defined at module level, so they can be sent
+        to the worker processes.
+    :param out_dir: the folder to write files to, created if needed
+    :param workers: the number of worker processes, defaults to the number
+        of CPUs, and 1 draws everything in this process
+    :param width: the width of each drawing
+    :param height: the height of each drawing
+    :param suffix: the file extension, like '.svg' or '.svgz'
+    :param callback: called with each BatchResult as soon as it finishes
+    :param options: passed to save_as(), like pretty or precision
+    :return: a BatchResult for each job, in the same order as jobs
+    """
+    if not isinstance(jobs, typing.Mapping):
+        jobs = {'job{:04}'.format(i): job for i, job in enumerate(jobs)}
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    tasks = [(name, job, out_dir / (name + suffix), width, height, options)
+             for name, job in jobs.items()]
+    results: typing.List[typing.Optional[BatchResult]] = [None] * len(tasks)
+    if workers <= 1:
+        for i, task in enumerate(tasks):
+            results[i] = result = render_job(*task)
+            if callback is not None:
+                callback(result)
+        return results
+
+    with ProcessPoolExecutor(workers) as executor:
+        futures = {executor.submit(render_job, *task): i
+                   for i, task in enumerate(tasks)}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                result = future.result()
+            except Exception:
+                # The job couldn't be sent, or the worker process died.
+                result = BatchResult(tasks[i][0],
+                                     None,
+                                     0.0,
+                                     traceback.format_exc())
+            results[i] = result
+            if callback is not None:
+                callback(result)
+    return results
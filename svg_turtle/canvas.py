@@ -1,12 +1,56 @@
+import gzip
+import math
 import typing
-from dataclasses import dataclass
-from operator import attrgetter
+from array import array
+from io import StringIO
+from itertools import groupby
+from operator import itemgetter
 
-from svgwrite import Drawing
+from .spatial import (Bounds, GridIndex, combine_bounds, encloses, find_bounds,
+                      overlaps)
+from .stats import RenderStats
+from .svg_writer import (SvgOptions, SvgWriter, XML_HEADER, format_number,
+                         format_points)
+
+if typing.TYPE_CHECKING:
+    from svgwrite import Drawing
+
+# NumPy and svgwrite are slow to import, so wait until they're needed.
+NOT_LOADED = object()
+np: typing.Any = NOT_LOADED
 
 ANCHOR_NAMES = dict(sw='start',
                     s='middle',
                     se='end')
+CREATE_METHOD_NAMES = ('create_line',
+                       'create_polygon',
+                       'create_text',
+                       'create_image',
+                       'create_arc',
+                       'create_oval')
+
+# An SVG element's tag, (name, value) attributes sorted by name, and text.
+ElementParts = typing.Tuple[str,
+                            typing.List[typing.Tuple[str, typing.Any]],
+                            typing.Optional[str]]
+# Attributes that place an element, instead of styling it, so group_styles
+# leaves them on the element.
+GEOMETRY_ATTRIBUTES = frozenset(['cx', 'cy', 'd', 'points', 'r', 'transform',
+                                 'x', 'xlink:href', 'y'])
+
+# Shorter items are faster to shift in plain Python than with NumPy.
+NUMPY_MIN_COORDS = 64
+# Compact the coordinate pool when it has at least this many unused values,
+# and they are at least half of the pool.
+MIN_COORD_GARBAGE = 1024
+# Same for gaps that deleted items leave in the paint order.
+MIN_PAINT_GAPS = 1024
+# How far the chords can stray from an arc, when it's drawn as a line.
+ARC_TOLERANCE = 0.1
+# save_as_async() writes the SVG text in chunks of about this many characters,
+# and lets other tasks run after this many elements, even if they're empty.
+ASYNC_CHUNK_SIZE = 64 * 1024
+ASYNC_ELEMENTS_PER_PAUSE = 1000
 
 
 class DummyWindow:
@@ -14,104 +58,971 @@ class DummyWindow:
         pass
 
 
+class ExportBackend:
+    """ Base class for turning canvas items into some other format.
+
+    Canvas.render() calls start(), then one add_ method for each visible
+    item from bottom to top, then returns whatever finish() returns.
+    Coordinates are in SVG units, with the same offsets as the SVG output.
+    """
+    def start(self, width: int, height: int, bgcolor: typing.Optional[str]):
+        pass
+
+    def add_line(self, coords: typing.Sequence[float], color: str, width):
+        """ Add a line through x, y pairs, with round caps. """
+        raise NotImplementedError()
+
+    def add_polygon(self,
+                    coords: typing.Sequence[float],
+                    fill: str,
+                    outline: str,
+                    width):
+        """ Add a filled polygon, with an empty outline for no border. """
+        raise NotImplementedError()
+
+    def add_text(self,
+                 x: float,
+                 y: float,
+                 text: str,
+                 font: typing.Tuple[str, float, str],
+                 anchor: str,
+                 color: str):
+        """ Add text with its baseline at y.
+
+        :param font: family, size in SVG units, and style
+        :param anchor: 'start', 'middle', or 'end', as in SVG
+        """
+        raise NotImplementedError()
+
+    def add_arc(self,
+                x: float,
+                y: float,
+                radius: float,
+                start: float,
+                extent: float,
+                color: str,
+                width):
+        """ Add an arc of a circle, with round caps.
+
+        Angles are in degrees, anticlockwise from three o'clock, like
+        Tkinter's. The default adds a line through points on the arc.
+        """
+        self.add_line(arc_coords(x, y, radius, start, extent), color, width)
+
+    def add_dot(self, x: float, y: float, radius: float, color: str):
+        """ Add a filled circle.
+
+        The default adds a line with no length, and round caps.
+        """
+        self.add_line((x, y, x, y), color, 2 * radius)
+
+    def finish(self):
+        pass
+
+
 class Canvas(object):
     def __init__(self, width=400, height=250):
         self.options = {'width': width,
                         'height': height,
                         'bg': 'white'}
-        self.items: typing.List[CanvasItem] = []
+        # Items by id. Deleted items are removed, but ids are never reused.
+        self.items: typing.Dict[int, CanvasItem] = {}
+        self.next_id = 0
+        self.deleted_count = 0
         self.max_zorder = 0
 
+        # Items from bottom to top, with None where items were deleted.
+        # Each item's z_order is its index in this list.
+        self.paint_order: typing.List[typing.Optional[CanvasItem]] = []
+        self.paint_gaps = 0
+
+        # Set cache_fragments to keep each item's SVG text between exports,
+        # and only format the items that changed. It costs memory, so it's
+        # for drawings that get exported repeatedly, like in a notebook.
+        self._cache_fragments = False
+        self.fragment_key = None  # Export settings for the cached text.
+
+        # All items' coordinates, in one array. See CanvasItem.
+        self.coord_pool = array('d')
+        self.coord_garbage = 0  # Values that no item uses any more.
+
+        # Identical attribute dicts are shared between items, and counted so
+        # they can be dropped when the last item using them goes.
+        self.attribs_pool: typing.Dict[tuple, dict] = {}
+        self.attribs_counts: typing.Dict[tuple, int] = {}
+
+        # Stamped shapes: symbol ids by points, points by symbol id, and how
+        # many items use each symbol, so unused ones can be dropped.
+        self.symbol_ids: typing.Dict[tuple, str] = {}
+        self.symbol_points: typing.Dict[str, tuple] = {}
+        self.symbol_counts: typing.Dict[str, int] = {}
+        self.next_symbol = 0
+
+        # Items by bounding box, built by the first query that needs it.
+        self.spatial_index: typing.Optional[GridIndex] = None
+
+        # Counters and timers, only while enable_stats() is on.
+        self.stats: typing.Optional[RenderStats] = None
+
         def make_call(method_name):
             return lambda *args, **kwargs: self.call(method_name,
                                                      *args,
                                                      **kwargs)
 
-        method_names = ('create_line',
-                        'create_polygon',
-                        'create_text',
-                        'create_image')
-        for name in method_names:
+        for name in CREATE_METHOD_NAMES:
             self.__dict__[name] = make_call(name)
 
     def call(self, method_name, *args, **kwargs):
         if method_name == 'create_polygon':
             args = args[0]
-        item_id = len(self.items)
-        item = CanvasItem(method_name, args, kwargs, z_order=item_id)
-        self.items.append(item)
+        if method_name not in CREATE_METHOD_NAMES:
+            # Tkinter's image calls also come through here, without coords.
+            args = ()
+        pool = self.coord_pool
+        item_id = self.next_id
+        self.next_id += 1
+        item = CanvasItem(method_name,
+                          self.intern_attribs(kwargs),
+                          pool,
+                          start=len(pool),
+                          length=len(args),
+                          z_order=len(self.paint_order))
+        pool.extend(args)
+        self.items[item_id] = item
+        self.paint_order.append(item)
+        if self.spatial_index is not None:
+            self.spatial_index.update(item_id, item.bounds)
         return item_id
 
-    def to_drawing(self):
+    def enable_stats(self, callback=None) -> RenderStats:
+        """ Start counting and timing the work done on this canvas.
+
+        The canvas methods are only wrapped with timers while stats are on,
+        so there's no cost the rest of the time.
+        :param callback: called with the stats dict after each export
+        :return: the RenderStats, which keeps counting until disable_stats()
+        """
+        stats = self.stats
+        if stats is not None:
+            if callback is not None:
+                stats.callback = callback
+            return stats
+        self.stats = stats = RenderStats(callback)
+        for name in CREATE_METHOD_NAMES:
+            stats.wrap(self, name, 'canvas', 'items_created')
+        stats.wrap(self, 'coords', 'canvas', 'coord_updates', min_args=2)
+        stats.wrap(self, 'extend_coords', 'canvas', 'coord_updates')
+        for name in ('itemconfigure', 'delete', 'tag_raise'):
+            stats.wrap(self, name, 'canvas')
+        for name in ('format_svg_element',
+                     'svg_element_parts',
+                     'format_path_data'):
+            stats.wrap(self, name, 'elements')
+        for name in ('to_svg', 'write_svg', 'save_as'):
+            stats.wrap(self, name, 'export', is_export=True)
+        stats.wrap(self, 'to_drawing', 'svgwrite', is_export=True)
+        stats.wrap(self, 'render', 'render', is_export=True)
+        return stats
+
+    def disable_stats(self):
+        """ Stop counting, and remove the timers. """
+        if self.stats is not None:
+            self.stats.unwrap()
+            self.stats = None
+
+    def get_stats(self) -> typing.Dict[str, float]:
+        """ Counts and phase times since enable_stats(), or {} if it's off.
+
+        Counts are items_created, coord_updates, svg_characters written, and
+        exports. Times are in seconds, excluding any nested phase: canvas
+        for item changes, elements for formatting SVG elements,
+        serialisation for writing them, export for the rest of the export,
+        svgwrite for building a Drawing, and render for an ExportBackend.
+        """
+        if self.stats is None:
+            return {}
+        return self.stats.as_dict()
+
+    def intern_attribs(self, attribs: dict) -> dict:
+        """ Share one dict between all items with the same attributes.
+
+        The shared dicts must not be changed, so itemconfigure() replaces
+        an item's dict instead of updating it. Call release_attribs() when
+        an item stops using it.
+        """
+        key = self.attribs_key(attribs)
+        if key is None:
+            return attribs
+        shared = self.attribs_pool.setdefault(key, attribs)
+        counts = self.attribs_counts
+        counts[key] = counts.get(key, 0) + 1
+        return shared
+
+    def release_attribs(self, attribs: dict):
+        """ Drop a shared dict from the pool if no other item uses it. """
+        key = self.attribs_key(attribs)
+        if key is None or self.attribs_pool.get(key) is not attribs:
+            return
+        counts = self.attribs_counts
+        count = counts[key] - 1
+        if count:
+            counts[key] = count
+        else:
+            del counts[key]
+            del self.attribs_pool[key]
+
+    @staticmethod
+    def attribs_key(attribs: dict) -> typing.Optional[tuple]:
+        """ Make a pool key for an attribute dict, or None to not share it.
+
+        Text is different for almost every item, so it isn't worth sharing.
+        """
+        if 'text' in attribs:
+            return None
+        key = tuple((name, type(value), value)
+                    for name, value in attribs.items())
+        try:
+            hash(key)
+        except TypeError:
+            # Unhashable value, so don't share it.
+            return None
+        return key
+
+    def to_drawing(self, **options):
+        """ Build an svgwrite Drawing from the canvas items.
+
+        :param options: any of the SvgOptions fields, except the layout ones
+        """
+        from svgwrite import Drawing
+
+        svg_options = SvgOptions(**options)
         drawing = Drawing(size=(self.winfo_width(), self.winfo_height()))
 
         bgcolor = self.options.get('bg')
         if bgcolor:
             drawing.add(drawing.rect(fill=bgcolor, size=('100%', '100%')))
 
-        for item_details in sorted(self.items, key=attrgetter('z_order')):
-            attribs = item_details.attribs.copy()
-            method_name = item_details.method_name
-            if method_name == 'create_polygon':
-                attribs['outline'] = ''
-                try:
-                    del attribs['width']
-                except KeyError:
-                    pass
-            self.add_svg_element(item_details, drawing)
+        offsets = self.svg_offsets()
+        viewport = self.viewport(offsets) if svg_options.cull else None
+        if svg_options.stamp_symbols:
+            precision = svg_options.precision
+            for symbol_id in self.used_symbols(viewport):
+                points = self.symbol_points[symbol_id]
+                if precision is not None:
+                    points = [(format_number(x, precision),
+                               format_number(y, precision))
+                              for x, y in points]
+                symbol = drawing.symbol(id=symbol_id, overflow='visible')
+                symbol.add(drawing.polygon(points))
+                drawing.defs.add(symbol)
+        if svg_options.group_styles:
+            self.add_style_groups(drawing, viewport, offsets, svg_options)
+            return drawing
+        for tag, attribs, text in self.iter_element_parts(viewport,
+                                                          offsets,
+                                                          svg_options):
+            drawing.add(build_svgwrite_element(drawing, tag, attribs, text))
         return drawing
 
-    def add_svg_element(self, item_details: 'CanvasItem', drawing: Drawing):
-        if item_details.is_deleted:
-            return
-        if item_details.attribs.get('fill') == '':
-            return
-        if item_details.attribs.get('image') == '':
-            return
+    def render(self, backend: ExportBackend, cull=False):
+        """ Send the visible items to an export backend, bottom to top.
+
+        :param cull: True to skip lines and polygons that are entirely
+            outside the picture
+        :return: whatever the backend's finish() method returns
+        """
+        backend.start(self.winfo_width(),
+                      self.winfo_height(),
+                      self.options.get('bg'))
+        offsets = self.svg_offsets()
+        viewport = self.viewport(offsets) if cull else None
+        for item_details in self.painted_items(viewport):
+            if self.is_hidden(item_details):
+                continue
+            coords = offset_coords(item_details.coords, *offsets)
+            attribs = item_details.attribs
+            method_name = item_details.method_name
+            if method_name == 'create_line':
+                backend.add_line(coords, attribs['fill'], attribs['width'])
+            elif method_name == 'create_polygon':
+                backend.add_polygon(coords,
+                                    attribs['fill'],
+                                    attribs['outline'],
+                                    attribs.get('width', 0))
+            elif method_name == 'create_text':
+                font_name, font_size, font_style = attribs['font']
+                x, y = coords
+                backend.add_text(x,
+                                 y - font_size*0.45,
+                                 attribs['text'],
+                                 (font_name, font_size*1.65, font_style),
+                                 ANCHOR_NAMES[attribs['anchor']],
+                                 attribs['fill'])
+            elif method_name == 'create_arc':
+                x, y, radius = find_circle(coords)
+                backend.add_arc(x,
+                                y,
+                                radius,
+                                attribs['start'],
+                                attribs['extent'],
+                                attribs['outline'],
+                                attribs['width'])
+            elif method_name == 'create_oval':
+                x, y, radius = find_circle(coords)
+                backend.add_dot(x, y, radius, attribs['fill'])
+        return backend.finish()
+
+    def svg_offsets(self) -> typing.Tuple[float, float]:
+        """ Find the shift from canvas coordinates to SVG coordinates. """
         sx1, sy1, sx2, sy2 = self.options.get(
             'scrollregion',
             (0, -self.winfo_height(), self.winfo_width(), 0))
-        xoff = 0.5 - sx1
-        yoff = 0.5 - sy1
-        coords = list(item_details.coords)
-        # noinspection DuplicatedCode
-        for i in range(0, len(coords), 2):
-            x, y = coords[i:i+2]
-            x = x + xoff
-            y = y + yoff
-            coords[i] = x
-            coords[i+1] = y
+        return 0.5 - sx1, 0.5 - sy1
+
+    def viewport(self, offsets: typing.Tuple[float, float]) -> Bounds:
+        """ Find the area that the picture shows, in canvas coordinates. """
+        xoff, yoff = offsets
+        return (-xoff,
+                -yoff,
+                self.winfo_width() - xoff,
+                self.winfo_height() - yoff)
+
+    @staticmethod
+    def is_outside(item_details: 'CanvasItem', viewport: Bounds) -> bool:
+        """ Check if a line or polygon can't reach into the viewport.
+
+        The bounds are widened by twice the line width, because that's as
+        far as SVG's default mitre joins can stick out. Text is never
+        outside, because its size depends on the font.
+        """
+        if item_details.method_name == 'create_text':
+            return False
+        bounds = item_details.bounds
+        if bounds is None:
+            return False
+        margin = 2 * item_details.attribs.get('width', 1)
+        x1, y1, x2, y2 = viewport
+        return not overlaps(bounds,
+                            (x1 - margin, y1 - margin, x2 + margin, y2 + margin))
+
+    def set_symbol(self,
+                   item,
+                   points: typing.Sequence[typing.Tuple[float, float]],
+                   transform: typing.Tuple[float, ...]):
+        """ Record that a polygon is a copy of a shape, for stamp_symbols.
+
+        Stamps of the same shape share a symbol, so the shape is only
+        written once.
+        :param item: the polygon's id, after its coordinates are set
+        :param points: the shape's points, before the transform
+        :param transform: the SVG matrix (a, b, c, d, e, f) that moves the
+            points to the polygon's canvas coordinates
+        """
+        item_details = self.items.get(item)
+        if item_details is None:
+            return
+        points = tuple(points)
+        symbol_id = self.symbol_ids.get(points)
+        if symbol_id is None:
+            symbol_id = 'shape{}'.format(self.next_symbol)
+            self.next_symbol += 1
+            self.symbol_ids[points] = symbol_id
+            self.symbol_points[symbol_id] = points
+            self.symbol_counts[symbol_id] = 0
+        self.symbol_counts[symbol_id] += 1
+        self.release_symbol(item_details)
+        item_details.symbol = (symbol_id, tuple(transform))
+        item_details.svg_fragment = None
+
+    def release_symbol(self, item_details: 'CanvasItem'):
+        """ Stop an item using its symbol, and drop the symbol if it's unused.
+        """
+        symbol = item_details.symbol
+        if symbol is None:
+            return
+        item_details.symbol = None
+        symbol_id = symbol[0]
+        counts = self.symbol_counts
+        count = counts[symbol_id] - 1
+        if count:
+            counts[symbol_id] = count
+        else:
+            del counts[symbol_id]
+            del self.symbol_ids[self.symbol_points.pop(symbol_id)]
+
+    def used_symbols(self, viewport: Bounds = None) -> typing.List[str]:
+        """ List the ids of the symbols that visible stamps use. """
+        symbol_ids = {}
+        for item_details in self.painted_items(viewport):
+            symbol = item_details.symbol
+            if symbol is not None and not self.is_hidden(item_details):
+                symbol_ids[symbol[0]] = None
+        return list(symbol_ids)
+
+    @staticmethod
+    def format_transform(transform: typing.Sequence[float],
+                         offsets: typing.Tuple[float, float],
+                         precision: int = None) -> str:
+        """ Format a symbol's transform, shifted by the SVG offsets. """
+        a, b, c, d, e, f = transform
+        xoff, yoff = offsets
+        values = [a, b, c, d, e + xoff, f + yoff]
+        if precision is not None:
+            # Rounding the rotation too much would distort the shape.
+            values[:4] = [format_number(value, max(precision, 4))
+                          for value in values[:4]]
+            values[4:] = [format_number(value, precision)
+                          for value in values[4:]]
+        return 'matrix({} {} {} {} {} {})'.format(*values)
+
+    @staticmethod
+    def is_hidden(item_details: 'CanvasItem'):
+        """ Check if an item has nothing to draw. """
+        return (item_details.is_deleted or
+                item_details.attribs.get('fill') == '' or
+                item_details.attribs.get('image') == '')
+
+    def painted_runs(
+            self,
+            viewport: Bounds = None) -> typing.Iterator[typing.List['CanvasItem']]:
+        """ Group the visible items into runs that can be merged.
+
+        Consecutive lines with the same colour and width form a run, and
+        every other item is in a run by itself. Merging a run doesn't change
+        the paint order, so the drawing looks the same.
+        :param viewport: if given, skip items that are outside it
+        """
+        run = []
+        run_style = None
+        for item_details in self.painted_items(viewport):
+            if self.is_hidden(item_details):
+                continue
+            if item_details.method_name != 'create_line':
+                if run:
+                    yield run
+                    run = []
+                yield [item_details]
+                continue
+            attribs = item_details.attribs
+            style = (attribs['fill'], attribs['width'])
+            if run and style != run_style:
+                yield run
+                run = []
+            run.append(item_details)
+            run_style = style
+        if run:
+            yield run
+
+    @staticmethod
+    def format_path_data(item_details: 'CanvasItem',
+                         offsets: typing.Tuple[float, float],
+                         svg_options: SvgOptions) -> str:
+        """ Format a line as a subpath, for a path element's d attribute.
+
+        Each line starts its own subpath, so the caps and joins are drawn
+        exactly as they were in separate polylines.
+        """
+        coords = offset_coords(item_details.coords, *offsets)
+        precision = svg_options.precision
+        path_data = 'M' + format_points(coords[:2], precision)
+        if len(coords) <= 2:
+            return path_data
+        if not svg_options.relative_paths:
+            return path_data + ' L' + format_points(coords[2:], precision)
+        if precision is not None:
+            # Round before subtracting, so the rounding errors don't add up.
+            coords = [round(value, precision) for value in coords]
+        steps = [value - previous
+                 for value, previous in zip(coords[2:], coords)]
+        return path_data + ' l' + format_points(steps, precision)
+
+    @staticmethod
+    def format_arc_data(item_details: 'CanvasItem',
+                        offsets: typing.Tuple[float, float],
+                        precision: int = None) -> str:
+        """ Format an arc item as path data, with an elliptical arc command.
+
+        Canvas angles go anticlockwise, but SVG's y axis points down, so
+        anticlockwise arcs have a sweep flag of 0.
+        """
+        x, y, radius = find_circle(offset_coords(item_details.coords,
+                                                 *offsets))
         attribs = item_details.attribs
+        extent = attribs['extent']
+        start = math.radians(attribs['start'])
+        end = start + math.radians(extent)
+        ends = [x + radius*math.cos(start),
+                y - radius*math.sin(start),
+                x + radius*math.cos(end),
+                y - radius*math.sin(end)]
+        return 'M{} A{} 0 {},{} {}'.format(
+            format_points(ends[:2], precision),
+            format_points((radius, radius), precision),
+            int(abs(extent) > 180),
+            int(extent < 0),
+            format_points(ends[2:], precision))
+
+    def add_style_groups(self,
+                         drawing: 'Drawing',
+                         viewport: typing.Optional[Bounds],
+                         offsets: typing.Tuple[float, float],
+                         svg_options: SvgOptions):
+        """ Add the same groups that write_style_groups() would write. """
+        container = None
+        for style, elements in self.style_groups(viewport,
+                                                 offsets,
+                                                 svg_options):
+            if container is None:
+                container = drawing.g(clip_path='url(#border_clip)')
+                drawing.add(container)
+            if len(elements) == 1:
+                tag, geometry, text = elements[0]
+                container.add(build_svgwrite_element(
+                    drawing,
+                    tag,
+                    merge_attributes(style, geometry),
+                    text))
+                continue
+            group = drawing.g()
+            group.update(dict(style))
+            for tag, geometry, text in elements:
+                group.add(build_svgwrite_element(drawing, tag, geometry, text))
+            container.add(group)
+
+    def add_svg_element(self,
+                        item_details: 'CanvasItem',
+                        drawing: 'Drawing',
+                        offsets: typing.Tuple[float, float] = None,
+                        precision: int = None,
+                        stamp_symbols: bool = False):
+        """ Add an item's element to an svgwrite Drawing, unless it's hidden.
+        """
+        parts = self.svg_element_parts(
+            item_details,
+            SvgOptions(precision=precision, stamp_symbols=stamp_symbols),
+            offsets)
+        if parts is not None:
+            drawing.add(build_svgwrite_element(drawing, *parts))
+
+    def to_svg(self, pretty=False, indent=2, verify=False, **options):
+        """ Build the SVG text without building an svgwrite Drawing.
+
+        :param pretty: True for indented output with line breaks
+        :param indent: how many spaces to indent, if pretty is True
+        :param verify: True to also build the svgwrite Drawing, and raise
+            RuntimeError if the two versions don't match exactly
+        :param options: any other SvgOptions fields
+        """
+        svg_file = StringIO()
+        self.write_svg(svg_file, pretty, indent, **options)
+        svg = svg_file.getvalue()
+        if verify:
+            from svgwrite.utils import pretty_xml
+
+            expected = self.to_drawing(**options).tostring()
+            if pretty:
+                expected = pretty_xml(expected, indent=indent)
+            if svg != expected:
+                raise RuntimeError('Streamed SVG does not match svgwrite.')
+        return svg
+
+    def write_svg(self, file: typing.TextIO, pretty=False, indent=2, **options):
+        """ Stream the SVG elements to a file object as they are built.
+
+        :param file: where to write the SVG text
+        :param pretty: True for indented output with line breaks
+        :param indent: how many spaces to indent, if pretty is True
+        :param options: any other SvgOptions fields
+        """
+        for _ in self.write_svg_steps(file, pretty, indent, **options):
+            pass
+
+    def write_svg_steps(self,
+                        file: typing.TextIO,
+                        pretty=False,
+                        indent=2,
+                        **options) -> typing.Iterator[None]:
+        """ Same as write_svg(), but pause after each element.
+
+        The caller decides when to continue, so it can do other work
+        between elements. Don't change the canvas until it's finished.
+        """
+        svg_options = SvgOptions(pretty, indent, **options)
+        if self.stats is not None:
+            file = self.stats.wrap_file(file)
+        writer = SvgWriter(file, svg_options)
+        offsets = self.svg_offsets()
+        viewport = self.viewport(offsets) if svg_options.cull else None
+        symbols = []
+        if svg_options.stamp_symbols:
+            for symbol_id in self.used_symbols(viewport):
+                coords = [value
+                          for point in self.symbol_points[symbol_id]
+                          for value in point]
+                symbols.append((symbol_id,
+                                format_points(coords, svg_options.precision)))
+        writer.start(self.winfo_width(),
+                     self.winfo_height(),
+                     self.options.get('bg'),
+                     symbols)
+        if self.cache_fragments:
+            fragment_key = (offsets, svg_options)
+            if fragment_key != self.fragment_key:
+                self.clear_fragments()
+                self.fragment_key = fragment_key
+        if svg_options.group_styles:
+            yield from self.write_style_groups(writer, viewport, offsets)
+        elif svg_options.merge_lines:
+            for run in self.painted_runs(viewport):
+                if run[0].method_name == 'create_line':
+                    self.write_svg_path(run, writer, offsets)
+                else:
+                    self.write_svg_element(run[0], writer, offsets)
+                yield
+        else:
+            for item_details in self.painted_items(viewport):
+                self.write_svg_element(item_details, writer, offsets)
+                yield
+        writer.finish()
+
+    def save_as(self,
+                filename,
+                pretty=False,
+                indent=2,
+                verify=False,
+                compress=None,
+                compresslevel=9,
+                **options):
+        """ Write an SVG file, with the same options as SvgTurtle.save_as(). """
+        svg_file = open_svg_file(filename, compress, compresslevel)
+        with svg_file:
+            svg_file.write(XML_HEADER)
+            if verify:
+                svg_file.write(self.to_svg(pretty, indent, verify, **options))
+            else:
+                self.write_svg(svg_file, pretty, indent, **options)
+
+    async def save_as_async(self,
+                            filename,
+                            pretty=False,
+                            indent=2,
+                            compress=None,
+                            compresslevel=9,
+                            chunk_size=ASYNC_CHUNK_SIZE,
+                            **options):
+        """ Write an SVG file without blocking the event loop for long.
+
+        The SVG text is built on the event loop, one chunk at a time, and
+        each chunk is written, and compressed if needed, in a worker thread.
+        Other tasks run between chunks, but they mustn't change this canvas
+        until it's finished.
+        :param chunk_size: roughly how many characters to build before
+            writing them
+        See save_as() for the other parameters.
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        svg_file = await loop.run_in_executor(None,
+                                              open_svg_file,
+                                              filename,
+                                              compress,
+                                              compresslevel)
+        try:
+            buffer = StringIO()
+            buffer.write(XML_HEADER)
+            elements_left = ASYNC_ELEMENTS_PER_PAUSE
+            for _ in self.write_svg_steps(buffer, pretty, indent, **options):
+                elements_left -= 1
+                if buffer.tell() >= chunk_size:
+                    chunk = buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+                    await loop.run_in_executor(None, svg_file.write, chunk)
+                    elements_left = ASYNC_ELEMENTS_PER_PAUSE
+                elif elements_left <= 0:
+                    await asyncio.sleep(0)
+                    elements_left = ASYNC_ELEMENTS_PER_PAUSE
+            await loop.run_in_executor(None,
+                                       svg_file.write,
+                                       buffer.getvalue())
+        finally:
+            await loop.run_in_executor(None, svg_file.close)
+
+    def write_style_groups(
+            self,
+            writer: SvgWriter,
+            viewport: typing.Optional[Bounds],
+            offsets: typing.Tuple[float, float]) -> typing.Iterator[None]:
+        """ Write the elements in groups, for the group_styles option.
+
+        Everything goes in one group with the clip path, and each run of
+        elements with the same style goes in a group with that style. An
+        element with no matching neighbours keeps its own style. It pauses
+        after each element, like write_svg_steps().
+        """
+        is_open = False
+        for style, elements in self.style_groups(viewport,
+                                                 offsets,
+                                                 writer.options):
+            if not is_open:
+                writer.open_group([('clip-path', 'url(#border_clip)')])
+                is_open = True
+            if len(elements) == 1:
+                tag, geometry, text = elements[0]
+                writer.add_element(tag,
+                                   merge_attributes(style, geometry),
+                                   text)
+                yield
+                continue
+            writer.open_group(style)
+            for tag, geometry, text in elements:
+                writer.add_element(tag, geometry, text)
+                yield
+            writer.close_group()
+        if is_open:
+            writer.close_group()
+
+    def style_groups(
+            self,
+            viewport: typing.Optional[Bounds],
+            offsets: typing.Tuple[float, float],
+            svg_options: SvgOptions
+    ) -> typing.Iterator[typing.Tuple[tuple, typing.List[ElementParts]]]:
+        """ Group the visible elements by style, from bottom to top.
+
+        :return: (style, elements) for each run of elements with the same
+            style, where style is the shared attributes as strings, apart
+            from the clip path, and each element only has its geometry
+            attributes
+        """
+        def split_style(parts: ElementParts):
+            tag, attribs, text = parts
+            style = tuple((name, str(value))
+                          for name, value in attribs
+                          if name not in GEOMETRY_ATTRIBUTES and
+                          name != 'clip-path')
+            geometry = [attrib
+                        for attrib in attribs
+                        if attrib[0] in GEOMETRY_ATTRIBUTES]
+            return style, (tag, geometry, text)
+
+        split_elements = map(split_style,
+                             self.iter_element_parts(viewport,
+                                                     offsets,
+                                                     svg_options))
+        for style, group in groupby(split_elements, key=itemgetter(0)):
+            yield style, [element for _, element in group]
+
+    def iter_element_parts(
+            self,
+            viewport: typing.Optional[Bounds],
+            offsets: typing.Tuple[float, float],
+            svg_options: SvgOptions) -> typing.Iterator[ElementParts]:
+        """ Describe the visible elements, merging lines if requested. """
+        if not svg_options.merge_lines:
+            for item_details in self.painted_items(viewport):
+                parts = self.svg_element_parts(item_details,
+                                               svg_options,
+                                               offsets)
+                if parts is not None:
+                    yield parts
+            return
+        for run in self.painted_runs(viewport):
+            if run[0].method_name == 'create_line':
+                path_data = ' '.join(self.iter_path_data(run,
+                                                         offsets,
+                                                         svg_options))
+                yield ('path',
+                       merge_attributes(self.path_attributes(run),
+                                        [('d', path_data)]),
+                       None)
+            else:
+                parts = self.svg_element_parts(run[0], svg_options, offsets)
+                if parts is not None:
+                    yield parts
+
+    def write_svg_path(self,
+                       run: typing.List['CanvasItem'],
+                       writer: SvgWriter,
+                       offsets: typing.Tuple[float, float]):
+        """ Write the path that iter_element_parts() describes for a run.
+
+        The path data is written a piece at a time, instead of joined first.
+        When fragments are cached, each line caches its path data.
+        """
+        writer.add_path(self.iter_path_data(run, offsets, writer.options),
+                        self.path_attributes(run))
+
+    @staticmethod
+    def path_attributes(
+            run: typing.List['CanvasItem']
+    ) -> typing.List[typing.Tuple[str, typing.Any]]:
+        """ The attributes of a run's merged path, apart from its data. """
+        attribs = run[0].attribs
+        return [('clip-path', 'url(#border_clip)'),
+                ('fill', 'none'),
+                ('stroke', attribs['fill']),
+                ('stroke-linecap', 'round'),
+                ('stroke-width', attribs['width'])]
+
+    def iter_path_data(self,
+                       run: typing.List['CanvasItem'],
+                       offsets: typing.Tuple[float, float],
+                       svg_options: SvgOptions):
+        cache_fragments = self.cache_fragments
+        for item_details in run:
+            fragment = item_details.svg_fragment
+            if fragment is None:
+                fragment = self.format_path_data(item_details,
+                                                 offsets,
+                                                 svg_options)
+                if cache_fragments:
+                    item_details.svg_fragment = fragment
+            yield fragment
+
+    def write_svg_element(self,
+                          item_details: 'CanvasItem',
+                          writer: SvgWriter,
+                          offsets: typing.Tuple[float, float] = None):
+        """ Write an item's element, from its cached text if possible. """
+        fragment = item_details.svg_fragment
+        if fragment is None:
+            fragment = self.format_svg_element(item_details, writer, offsets)
+            if self.cache_fragments:
+                item_details.svg_fragment = fragment
+        writer.write(fragment)
+
+    @property
+    def cache_fragments(self) -> bool:
+        return self._cache_fragments
+
+    @cache_fragments.setter
+    def cache_fragments(self, cache_fragments: bool):
+        if not cache_fragments:
+            # Exports without the cache always format every item.
+            self.clear_fragments()
+            self.fragment_key = None
+        self._cache_fragments = cache_fragments
+
+    def clear_fragments(self):
+        """ Forget all the cached SVG text for items. """
+        for item_details in self.items.values():
+            item_details.svg_fragment = None
+
+    def format_svg_element(self,
+                           item_details: 'CanvasItem',
+                           writer: SvgWriter,
+                           offsets: typing.Tuple[float, float] = None) -> str:
+        """ Format an item as SVG text, or an empty string to skip it. """
+        parts = self.svg_element_parts(item_details, writer.options, offsets)
+        if parts is None:
+            return ''
+        return writer.format_element(*parts)
+
+    def svg_element_parts(
+            self,
+            item_details: 'CanvasItem',
+            svg_options: SvgOptions,
+            offsets: typing.Tuple[float, float] = None
+    ) -> typing.Optional[ElementParts]:
+        """ Describe an item's SVG element, or return None to skip it.
+
+        Both the SvgWriter and the svgwrite Drawing build their elements
+        from this description, so they can't disagree.
+        """
+        if self.is_hidden(item_details):
+            return None
+        if offsets is None:
+            offsets = self.svg_offsets()
+        attribs = item_details.attribs
+        clip_path = 'url(#border_clip)'
+        precision = svg_options.precision
+        symbol = item_details.symbol
+        if symbol is not None and svg_options.stamp_symbols:
+            symbol_id, transform = symbol
+            return ('use',
+                    [('clip-path', clip_path),
+                     ('fill', attribs['fill']),
+                     ('fill-rule', 'evenodd'),
+                     ('stroke', attribs['outline']),
+                     ('stroke-width', attribs.get('width', 0)),
+                     ('transform', self.format_transform(transform,
+                                                         offsets,
+                                                         precision)),
+                     ('xlink:href', '#' + symbol_id)],
+                    None)
+        coords = offset_coords(item_details.coords, *offsets)
         if item_details.method_name == 'create_line':
-            drawing.add(drawing.polyline(build_coordinate_pairs(coords),
-                                         stroke=attribs['fill'],
-                                         stroke_width=attribs['width'],
-                                         stroke_linecap='round',
-                                         fill='none',
-                                         clip_path='url(#border_clip)'))
-        elif item_details.method_name == 'create_polygon':
-            drawing.add(drawing.polygon(build_coordinate_pairs(coords),
-                                        fill=attribs['fill'],
-                                        stroke=attribs['outline'],
-                                        stroke_width=attribs.get('width', 0),
-                                        fill_rule='evenodd',
-                                        clip_path='url(#border_clip)'))
-        elif item_details.method_name == 'create_text':
+            return ('polyline',
+                    [('clip-path', clip_path),
+                     ('fill', 'none'),
+                     ('points', format_points(coords, precision)),
+                     ('stroke', attribs['fill']),
+                     ('stroke-linecap', 'round'),
+                     ('stroke-width', attribs['width'])],
+                    None)
+        if item_details.method_name == 'create_polygon':
+            return ('polygon',
+                    [('clip-path', clip_path),
+                     ('fill', attribs['fill']),
+                     ('fill-rule', 'evenodd'),
+                     ('points', format_points(coords, precision)),
+                     ('stroke', attribs['outline']),
+                     ('stroke-width', attribs.get('width', 0))],
+                    None)
+        if item_details.method_name == 'create_text':
             font_name, font_size, font_style = attribs['font']
             x, y = coords
             y -= font_size * 0.45
+            if precision is not None:
+                x = format_number(x, precision)
+                y = format_number(y, precision)
             font_size *= 1.65
             style = 'font-family: {}; font-size: {}; font-style: {};'.format(
                 font_name,
                 font_size,
                 font_style)
-
-            drawing.add(drawing.text(attribs['text'],
-                                     insert=(x, y),
-                                     text_anchor=ANCHOR_NAMES[attribs['anchor']],
-                                     style=style,
-                                     fill=attribs['fill'],
-                                     clip_path='url(#border_clip)'))
+            return ('text',
+                    [('clip-path', clip_path),
+                     ('fill', attribs['fill']),
+                     ('style', style),
+                     ('text-anchor', ANCHOR_NAMES[attribs['anchor']]),
+                     ('x', x),
+                     ('y', y)],
+                    attribs['text'])
+        if item_details.method_name == 'create_arc':
+            if abs(attribs['extent']) >= 360:
+                x, y, radius = find_circle(coords, precision)
+                return ('circle',
+                        [('clip-path', clip_path),
+                         ('cx', x),
+                         ('cy', y),
+                         ('fill', 'none'),
+                         ('r', radius),
+                         ('stroke', attribs['outline']),
+                         ('stroke-width', attribs['width'])],
+                        None)
+            return ('path',
+                    [('clip-path', clip_path),
+                     ('d', self.format_arc_data(item_details,
+                                                offsets,
+                                                precision)),
+                     ('fill', 'none'),
+                     ('stroke', attribs['outline']),
+                     ('stroke-linecap', 'round'),
+                     ('stroke-width', attribs['width'])],
+                    None)
+        if item_details.method_name == 'create_oval':
+            x, y, radius = find_circle(coords, precision)
+            return ('circle',
+                    [('clip-path', clip_path),
+                     ('cx', x),
+                     ('cy', y),
+                     ('fill', attribs['fill']),
+                     ('r', radius)],
+                    None)
+        return None
 
     def cget(self, option):
         return self[option]
@@ -129,24 +1040,178 @@ class Canvas(object):
         self.options.update(kwargs)
 
     def find_all(self):
-        return range(len(self.items))
+        return list(self.items)
 
     def coords(self, item, *coords):
-        item_details = self.items[item]
+        item_details = self.items.get(item)
+        if item_details is None:
+            # Like Tkinter, ignore items that were deleted.
+            return ()
         if len(coords) == 0:
             return item_details.coords
-        item_details.coords = coords
+        pool = self.coord_pool
+        start = item_details.start
+        old_length = item_details.length
+        new_length = len(coords)
+        if start + old_length == len(pool):
+            # Last item in the pool, so it can grow or shrink in place.
+            del pool[start:]
+            pool.extend(coords)
+        elif new_length <= old_length:
+            pool[start:start+new_length] = array('d', coords)
+            self.coord_garbage += old_length - new_length
+        else:
+            item_details.start = len(pool)
+            pool.extend(coords)
+            self.coord_garbage += old_length
+        item_details.length = new_length
+        item_details.svg_fragment = None
+        item_details.cached_bounds = None
+        self.release_symbol(item_details)  # Not a copy of the shape any more.
+        if self.spatial_index is not None:
+            self.spatial_index.update(item, item_details.bounds)
+        self.check_coord_garbage()
 
-    def itemconfigure(self, item, **kwargs):
+    def extend_coords(self, item, coords: typing.Sequence[float]):
+        """ Append coordinates to an item without copying the old ones.
+
+        The turtle keeps adding points to the end of its current line, so
+        this avoids rebuilding the whole line after every step.
+        """
         item_details = self.items[item]
-        item_details.attribs.update(kwargs)
+        pool = self.coord_pool
+        start = item_details.start
+        old_length = item_details.length
+        if start + old_length != len(pool):
+            # Move it to the end of the pool, where it has room to grow.
+            item_details.start = len(pool)
+            pool.extend(pool[start:start+old_length])
+            self.coord_garbage += old_length
+        pool.extend(coords)
+        item_details.length = old_length + len(coords)
+        item_details.svg_fragment = None
+        bounds = item_details.cached_bounds
+        if bounds is not None and len(coords) >= 2:
+            # Lines only grow, so just widen the old bounds.
+            item_details.cached_bounds = combine_bounds(bounds,
+                                                        find_bounds(coords))
+        if self.spatial_index is not None:
+            self.spatial_index.update(item, item_details.bounds)
+        self.check_coord_garbage()
+
+    def last_point(self, item) -> typing.Optional[typing.Tuple[float, float]]:
+        """ Get an item's last x, y pair without copying all its coords. """
+        item_details = self.items.get(item)
+        if item_details is None or item_details.length < 2:
+            return None
+        end = item_details.start + item_details.length
+        return self.coord_pool[end-2], self.coord_pool[end-1]
+
+    def check_coord_garbage(self):
+        garbage = self.coord_garbage
+        if garbage >= MIN_COORD_GARBAGE and 2*garbage >= len(self.coord_pool):
+            self.compact_coords()
+
+    def compact_coords(self):
+        """ Copy all items' coordinates to remove the gaps between them. """
+        pool = self.coord_pool
+        compacted = array('d')
+        for item_details in self.items.values():
+            start = item_details.start
+            item_details.start = len(compacted)
+            compacted += pool[start:start+item_details.length]
+        pool[:] = compacted
+        self.coord_garbage = 0
+
+    def itemconfigure(self, item, **kwargs):
+        item_details = self.items.get(item)
+        if item_details is None:
+            return
+        attribs = item_details.attribs
+        for name, value in kwargs.items():
+            old_value = attribs.get(name, kwargs)
+            if old_value != value or type(old_value) is not type(value):
+                break
+        else:
+            # Nothing changed.
+            return
+        self.release_attribs(attribs)
+        attribs = dict(attribs)
+        attribs.update(kwargs)
+        item_details.attribs = self.intern_attribs(attribs)
+        item_details.svg_fragment = None
 
     def delete(self, item):
         if item == 'all':
+            self.deleted_count += len(self.items)
             self.items.clear()
-        else:
-            item_details = self.items[item]
-            item_details.is_deleted = True
+            self.paint_order.clear()
+            self.paint_gaps = 0
+            del self.coord_pool[:]
+            self.coord_garbage = 0
+            self.attribs_pool.clear()
+            self.attribs_counts.clear()
+            self.symbol_ids.clear()
+            self.symbol_points.clear()
+            self.symbol_counts.clear()
+            self.next_symbol = 0
+            self.spatial_index = None
+            return
+        item_details = self.items.pop(item, None)
+        if item_details is None:
+            return
+        if self.spatial_index is not None:
+            self.spatial_index.remove(item)
+        self.release_attribs(item_details.attribs)
+        self.release_symbol(item_details)
+        item_details.is_deleted = True
+        self.deleted_count += 1
+        self.coord_garbage += item_details.length
+        self.check_coord_garbage()
+        self.paint_order[item_details.z_order] = None
+        self.paint_gaps += 1
+        gaps = self.paint_gaps
+        if gaps >= MIN_PAINT_GAPS and 2*gaps >= len(self.paint_order):
+            self.compact_paint_order()
+
+    def compact_paint_order(self):
+        """ Remove the gaps that deleted items left in the paint order. """
+        paint_order = [item_details
+                       for item_details in self.paint_order
+                       if item_details is not None]
+        for z_order, item_details in enumerate(paint_order):
+            item_details.z_order = z_order
+        self.paint_order = paint_order
+        self.paint_gaps = 0
+
+    def painted_items(
+            self,
+            viewport: Bounds = None) -> typing.Iterator['CanvasItem']:
+        """ Iterate through the items from bottom to top.
+
+        :param viewport: if given, skip items that are outside it
+        """
+        if viewport is None:
+            return (item_details
+                    for item_details in self.paint_order
+                    if item_details is not None)
+        is_outside = self.is_outside
+        return (item_details
+                for item_details in self.paint_order
+                if item_details is not None and
+                not is_outside(item_details, viewport))
+
+    def item_stats(self) -> typing.Dict[str, int]:
+        """ Count live and deleted items, and used and unused coordinates.
+
+        Deleted items are dropped right away, and their coordinates are
+        reclaimed the next time the coordinate pool is compacted.
+        """
+        unused = self.coord_garbage
+        return dict(live_items=len(self.items),
+                    deleted_items=self.deleted_count,
+                    coord_values=len(self.coord_pool) - unused,
+                    unused_coord_values=unused)
 
     @staticmethod
     def winfo_toplevel():
@@ -174,28 +1239,258 @@ class Canvas(object):
         pass
 
     def tag_raise(self, item):
-        if item + 1 < len(self.items):
-            self.items[item].z_order, self.items[item+1].z_order = (
-                self.items[item+1].z_order, self.items[item].z_order)
+        item_details = self.items.get(item)
+        next_details = self.items.get(item + 1)
+        if item_details is not None and next_details is not None:
+            z_order = item_details.z_order
+            next_z_order = next_details.z_order
+            item_details.z_order = next_z_order
+            next_details.z_order = z_order
+            self.paint_order[z_order] = next_details
+            self.paint_order[next_z_order] = item_details
 
-    def bbox(self, item):
-        item_details = self.items[item]
-        # noinspection PyTupleAssignmentBalance
-        x, y = item_details.coords
-        return x, y, x, y
+    def bbox(self, *items) -> typing.Optional[Bounds]:
+        """ Find the bounding box around the coordinates of some items.
+
+        Unlike Tkinter, it doesn't add the line width, or round to integers.
+        :return: (x1, y1, x2, y2), or None if no items have coordinates
+        """
+        found = None
+        for item in items:
+            item_details = self.items.get(item)
+            if item_details is None:
+                continue
+            bounds = item_details.bounds
+            if bounds is None:
+                continue
+            found = bounds if found is None else combine_bounds(found, bounds)
+        return found
+
+    def get_spatial_index(self) -> GridIndex:
+        """ Build the index of item bounds the first time it's needed.
+
+        After that, every change to the items keeps it up to date.
+        """
+        index = self.spatial_index
+        if index is None:
+            self.spatial_index = index = GridIndex()
+            for item, item_details in self.items.items():
+                bounds = item_details.bounds
+                if bounds is not None:
+                    index.add(item, bounds)
+        return index
+
+    def find_overlapping(self, x1, y1, x2, y2) -> typing.Tuple[int, ...]:
+        """ Find items whose bounding boxes touch a rectangle.
+
+        :return: item ids from bottom to top, like Tkinter
+        """
+        return self.find_in_area((x1, y1, x2, y2), overlaps)
+
+    def find_enclosed(self, x1, y1, x2, y2) -> typing.Tuple[int, ...]:
+        """ Find items whose bounding boxes are inside a rectangle.
+
+        :return: item ids from bottom to top, like Tkinter
+        """
+        return self.find_in_area((x1, y1, x2, y2), encloses)
+
+    def find_in_area(self,
+                     area: Bounds,
+                     is_match: typing.Callable[[Bounds, Bounds], bool]):
+        x1, y1, x2, y2 = area
+        area = min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)
+        items = self.items
+        found = []
+        for item in self.get_spatial_index().candidates(area):
+            item_details = items[item]
+            if is_match(area, item_details.bounds):
+                found.append((item_details.z_order, item))
+        found.sort()
+        return tuple(item for _, item in found)
 
     def type(self, item):
-        item_details = self.items[item]
+        item_details = self.items.get(item)
+        if item_details is None:
+            return None
         return item_details.method_name[7:]
 
 
-@dataclass
 class CanvasItem:
-    method_name: str
-    coords: typing.Tuple[float]
-    attribs: dict
-    z_order: int = 0
-    is_deleted: bool = False
+    """ One item on the canvas.
+
+    To keep large drawings small, the coordinates aren't stored in the item.
+    They are a slice of the canvas's coord_pool, from start to
+    start + length, and the attribs dict may be shared with other items.
+    If the canvas caches fragments, svg_fragment holds the item's SVG text,
+    or None after a change. Stamps also record the shape they copy.
+    """
+    __slots__ = ('method_name',
+                 'attribs',
+                 'pool',
+                 'start',
+                 'length',
+                 'z_order',
+                 'is_deleted',
+                 'svg_fragment',
+                 'cached_bounds',
+                 'symbol')
+
+    def __init__(self,
+                 method_name: str,
+                 attribs: dict,
+                 pool: array,
+                 start: int,
+                 length: int,
+                 z_order: int = 0,
+                 is_deleted: bool = False):
+        self.method_name = method_name
+        self.attribs = attribs
+        self.pool = pool
+        self.start = start
+        self.length = length
+        self.z_order = z_order
+        self.is_deleted = is_deleted
+        self.svg_fragment: typing.Optional[str] = None
+        self.cached_bounds: typing.Optional[Bounds] = None
+        # (symbol id, transform) if it's a stamp, see Canvas.set_symbol().
+        self.symbol: typing.Optional[typing.Tuple[str, tuple]] = None
+
+    def __repr__(self):
+        return (f'CanvasItem({self.method_name!r}, {self.coords!r}, '
+                f'{self.attribs!r}, z_order={self.z_order!r}, '
+                f'is_deleted={self.is_deleted!r})')
+
+    @property
+    def coords(self) -> array:
+        start = self.start
+        return self.pool[start:start+self.length]
+
+    @property
+    def bounds(self) -> typing.Optional[Bounds]:
+        """ The bounding box of the coordinates, or None if there are none.
+
+        It's cached until the canvas changes the coordinates.
+        """
+        bounds = self.cached_bounds
+        if bounds is None:
+            self.cached_bounds = bounds = find_bounds(self.coords)
+        return bounds
+
+
+def merge_attributes(
+        style: typing.Iterable[typing.Tuple[str, typing.Any]],
+        geometry: typing.Iterable[typing.Tuple[str, typing.Any]]
+) -> typing.List[typing.Tuple[str, typing.Any]]:
+    """ Put style and geometry attributes back together, sorted by name. """
+    return sorted([*style, *geometry], key=itemgetter(0))
+
+
+def build_svgwrite_element(drawing: 'Drawing',
+                           tag: str,
+                           attribs: typing.Iterable[typing.Tuple[str,
+                                                                 typing.Any]],
+                           text: str = None):
+    """ Build an svgwrite element from the parts of an SVG element. """
+    attribs = dict(attribs)
+    if tag in ('polyline', 'polygon'):
+        points = [tuple(point.split(','))
+                  for point in attribs.pop('points').split(' ')]
+        element = getattr(drawing, tag)(points)
+    elif tag == 'path':
+        element = drawing.path(attribs.pop('d'))
+    elif tag == 'text':
+        element = drawing.text(text)
+    elif tag == 'use':
+        element = drawing.use(attribs.pop('xlink:href'))
+    else:
+        element = getattr(drawing, tag)()
+    element.update(attribs)
+    return element
+
+
+def open_svg_file(filename, compress: bool = None, compresslevel: int = 9):
+    """ Open a text file to write SVG to, compressed if requested.
+
+    :param compress: True to write gzip-compressed SVGZ, False for plain SVG,
+        or None to compress when the file name ends with .svgz
+    """
+    if compress is None:
+        compress = str(filename).lower().endswith('.svgz')
+    if compress:
+        # The elements are compressed as they are written.
+        return gzip.open(filename,
+                         'wt',
+                         compresslevel=compresslevel,
+                         encoding='utf-8')
+    return open(filename, 'w', encoding='utf-8')
+
+
+def find_circle(coords: typing.Sequence[float],
+                precision: int = None) -> typing.List[typing.Any]:
+    """ Find the centre x, y and the radius of a circle's bounding box.
+
+    :param precision: number of decimal places to format them with, or None
+        to leave them as numbers
+    """
+    x1, y1, x2, y2 = coords
+    values = [(x1 + x2) / 2, (y1 + y2) / 2, (x2 - x1) / 2]
+    if precision is not None:
+        values = [format_number(value, precision) for value in values]
+    return values
+
+
+def arc_coords(x: float,
+               y: float,
+               radius: float,
+               start: float,
+               extent: float,
+               tolerance: float = ARC_TOLERANCE) -> typing.List[float]:
+    """ Find flat x, y coordinates along an arc, for drawing it as a line.
+
+    The number of points adapts to the radius, so that no chord is further
+    than tolerance from the arc.
+    :param start: degrees anticlockwise from three o'clock
+    :param extent: degrees to go anticlockwise, or negative for clockwise
+    """
+    extent = max(-360.0, min(360.0, extent))
+    if radius > tolerance:
+        max_step = 2 * math.acos(1 - tolerance/radius)
+    else:
+        max_step = math.pi / 2
+    steps = max(1, math.ceil(abs(math.radians(extent)) / max_step))
+    start = math.radians(start)
+    step = math.radians(extent) / steps
+    coords = []
+    for i in range(steps + 1):
+        angle = start + i*step
+        coords.append(x + radius*math.cos(angle))
+        coords.append(y - radius*math.sin(angle))
+    return coords
+
+
+def offset_coords(coords: typing.Sequence[float],
+                  xoff: float,
+                  yoff: float) -> typing.List[float]:
+    """ Shift flat x, y coordinates, using NumPy for long items. """
+    if len(coords) >= NUMPY_MIN_COORDS and load_numpy() is not None:
+        points = np.asarray(coords, dtype=float).reshape(-1, 2)
+        return (points + (xoff, yoff)).ravel().tolist()
+    shifted = list(coords)
+    shifted[0::2] = [x + xoff for x in coords[0::2]]
+    shifted[1::2] = [y + yoff for y in coords[1::2]]
+    return shifted
+
+
+def load_numpy():
+    """ Import NumPy the first time it's needed, or None if it's missing. """
+    global np
+    if np is NOT_LOADED:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        np = numpy
+    return np
 
 
 def build_coordinate_pairs(coords: typing.Sequence[float]):
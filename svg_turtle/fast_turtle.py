@@ -0,0 +1,690 @@
+import math
+
+from .canvas import Canvas
+from .svg_turtle import (DEFAULT_FONT, ExportMixin, TurtleGraphicsError,
+                         describe_color, normalize_color, normalize_font)
+
+# Import after svg_turtle, which sets up Tkinter if it's missing.
+from turtle import Vec2D
+
+# Polygon outlines of the standard turtle shapes.
+SHAPES = {
+    "arrow": ((-10, 0), (10, 0), (0, 10)),
+    "turtle": ((0, 16), (-2, 14), (-1, 10), (-4, 7), (-7, 9), (-9, 8),
+               (-6, 5), (-7, 1), (-5, -3), (-8, -6), (-6, -8), (-4, -5),
+               (0, -7), (4, -5), (6, -8), (8, -6), (5, -3), (7, 1), (6, 5),
+               (9, 8), (7, 9), (4, 7), (1, 10), (2, 14)),
+    "circle": ((10, 0), (9.51, 3.09), (8.09, 5.88), (5.88, 8.09),
+               (3.09, 9.51), (0, 10), (-3.09, 9.51), (-5.88, 8.09),
+               (-8.09, 5.88), (-9.51, 3.09), (-10, 0), (-9.51, -3.09),
+               (-8.09, -5.88), (-5.88, -8.09), (-3.09, -9.51),
+               (-0.00, -10.00), (3.09, -9.51), (5.88, -8.09), (8.09, -5.88),
+               (9.51, -3.09)),
+    "square": ((10, -10), (10, 10), (-10, 10), (-10, -10)),
+    "triangle": ((10, -5.77), (0, 11.55), (-10, -5.77)),
+    "classic": ((0, 0), (-5, -9), (0, -7), (5, -9)),
+    "blank": None}
+
+TEXT_ANCHORS = {"left": "sw", "center": "s", "right": "se"}
+
+# RawTurtle starts a new line item after this many points.
+MAX_LINE_POINTS = 42
+
+
+class FastScreen:
+    """ The parts of TurtleScreen that make sense without a window. """
+    def __init__(self, canvas: Canvas):
+        self.cv = canvas
+        width = canvas.winfo_width()
+        height = canvas.winfo_height()
+        canvas.config(scrollregion=(-width//2, -height//2,
+                                    width//2, height//2))
+        self.xscale = self.yscale = 1.0
+        self._colormode = 1.0
+
+    def bgcolor(self, *args):
+        if args:
+            self.cv.config(bg=normalize_color(args, self._colormode))
+            return None
+        return describe_color(self.cv.cget('bg'))
+
+    def colormode(self, cmode=None):
+        if cmode is None:
+            return self._colormode
+        if cmode == 1.0:
+            self._colormode = float(cmode)
+        elif cmode == 255:
+            self._colormode = int(cmode)
+
+    def getcanvas(self):
+        return self.cv
+
+    def getshapes(self):
+        return sorted(SHAPES)
+
+    def window_width(self):
+        return self.cv.winfo_width()
+
+    def window_height(self):
+        return self.cv.winfo_height()
+
+    def mode(self, mode=None):
+        if mode is None:
+            return 'standard'
+        if mode != 'standard':
+            raise NotImplementedError('Only standard mode is supported.')
+
+    def tracer(self, n=None, delay=None):
+        if n is None:
+            return 1
+
+    def delay(self, delay=None):
+        if delay is None:
+            return 0
+
+    def update(self):
+        pass
+
+    def title(self, title):
+        pass
+
+    def setup(self, width=None, height=None, startx=None, starty=None):
+        pass
+
+    def mainloop(self):
+        pass
+
+    def done(self):
+        pass
+
+    def bye(self):
+        pass
+
+    def exitonclick(self):
+        pass
+
+
+class FastSvgTurtle(ExportMixin):
+    """ A turtle that draws straight onto the canvas, without animation.
+
+    It has the same drawing methods as SvgTurtle, and produces the same SVG,
+    but it doesn't go through RawTurtle, so it skips all the work of
+    animating, updating, and recording undo steps after every move. It
+    doesn't support undo, or logo and world modes.
+    """
+    def __init__(self, width=400, height=250, native_arcs=False):
+        """ Initialize.
+
+        :param width: the picture's width
+        :param height: the picture's height
+        :param native_arcs: True to draw circle() as SVG arcs, and dot() as
+            circle elements, like SvgTurtle
+        """
+        self.native_arcs = native_arcs
+        canvas = Canvas(width, height)
+        canvas.config(bg='')
+        self.screen = FastScreen(canvas)
+        self._x = self._y = 0.0
+        self._orient_x, self._orient_y = 1.0, 0.0
+        self.degrees()
+        self._reset_pen()
+        self._shape = 'classic'
+        self._stamp_items = {}
+        self._fill_item = self._fill_path = None
+        self._line_item = self._create_line()
+        self._items = [self._line_item]
+        # Flat x, y canvas coordinates, sent to the canvas when needed.
+        self._line = [self._x, -self._y]
+        self._line_sent = 2
+
+    def _reset_pen(self):
+        self._pensize = 1
+        self._shown = True
+        self._pencolor = 'black'
+        self._fillcolor = 'black'
+        self._drawing = True
+        self._resizemode = 'noresize'
+        self._stretchfactor = (1., 1.)
+        self._outlinewidth = 1
+
+    def getscreen(self):
+        return self.screen
+
+    def getcanvas(self):
+        return self.screen.cv
+
+    # Movement
+
+    def forward(self, distance):
+        self._goto(self._x + self._orient_x * distance,
+                   self._y + self._orient_y * distance)
+
+    fd = forward
+
+    def back(self, distance):
+        self.forward(-distance)
+
+    bk = backward = back
+
+    def left(self, angle):
+        self._rotate(angle)
+
+    lt = left
+
+    def right(self, angle):
+        self._rotate(-angle)
+
+    rt = right
+
+    def goto(self, x, y=None):
+        if y is None:
+            x, y = x
+        self._goto(x, y)
+
+    setpos = setposition = goto
+
+    def setx(self, x):
+        self._goto(x, self._y)
+
+    def sety(self, y):
+        self._goto(self._x, y)
+
+    def home(self):
+        self.goto(0, 0)
+        self.setheading(0)
+
+    def setheading(self, to_angle):
+        angle = to_angle - self.heading()
+        full = self._fullcircle
+        angle = (angle+full/2.) % full - full/2.
+        self._rotate(angle)
+
+    seth = setheading
+
+    def heading(self):
+        x, y = self._orient_x, self._orient_y
+        result = round(math.degrees(math.atan2(y, x)), 10) % 360.0
+        result /= self._degreesPerAU
+        return result % self._fullcircle
+
+    def position(self):
+        return Vec2D(self._x, self._y)
+
+    pos = position
+
+    def xcor(self):
+        return self._x
+
+    def ycor(self):
+        return self._y
+
+    def towards(self, x, y=None):
+        x, y = self._target(x, y)
+        result = round(math.degrees(math.atan2(y - self._y, x - self._x)),
+                       10) % 360.0
+        result /= self._degreesPerAU
+        return result % self._fullcircle
+
+    def distance(self, x, y=None):
+        x, y = self._target(x, y)
+        return math.hypot(x - self._x, y - self._y)
+
+    @staticmethod
+    def _target(x, y):
+        if y is not None:
+            return x, y
+        if isinstance(x, FastSvgTurtle):
+            return x._x, x._y
+        return x
+
+    def degrees(self, fullcircle=360.0):
+        self._fullcircle = fullcircle
+        self._degreesPerAU = 360/fullcircle
+
+    def radians(self):
+        self.degrees(2*math.pi)
+
+    def circle(self, radius, extent=None, steps=None):
+        if extent is None:
+            extent = self._fullcircle
+        if steps is None:
+            frac = abs(extent)/self._fullcircle
+            steps = 1+int(min(11+abs(radius)/6.0, 59.0)*frac)
+            if self.native_arcs and radius and extent and self._drawing:
+                self._draw_arc(radius, extent, steps)
+                return
+        w = 1.0 * extent / steps
+        w2 = 0.5 * w
+        distance = 2.0 * radius * math.sin(
+            math.radians(w2)*self._degreesPerAU)
+        if radius < 0:
+            distance, w, w2 = -distance, -w, -w2
+        self._rotate(w2)
+        for _ in range(steps):
+            self.forward(distance)
+            self._rotate(w)
+        self._rotate(-w2)
+
+    def _draw_arc(self, radius, extent, steps):
+        """ Draw an arc item, with the same steps as SvgTurtle.circle(). """
+        x, y = self._x, self._y
+        e0, e1 = self._orient_x, self._orient_y
+        center_x = x - radius*e1
+        center_y = y + radius*e0
+        start = math.degrees(math.atan2(y - center_y, x - center_x))
+        arc_extent = extent * self._degreesPerAU
+        if radius < 0:
+            arc_extent = -arc_extent
+        x = center_x * 1.0
+        y = -center_y * 1.0
+        arc_radius = abs(radius) * 1.0
+        item = self.screen.cv.create_arc(x - arc_radius,
+                                         y - arc_radius,
+                                         x + arc_radius,
+                                         y + arc_radius,
+                                         start=start,
+                                         extent=arc_extent,
+                                         style='arc',
+                                         outline=self._pencolor,
+                                         width=self._pensize)
+        self._add_above_line(item)
+        self._drawing = False
+        try:
+            self.circle(radius, extent, steps)
+        finally:
+            self._drawing = True
+        self._line = [self._x * 1.0, -self._y * 1.0]
+
+    def _rotate(self, angle):
+        angle = math.radians(angle * self._degreesPerAU)
+        c, s = math.cos(angle), math.sin(angle)
+        x, y = self._orient_x, self._orient_y
+        self._orient_x = x*c - y*s
+        self._orient_y = y*c + x*s
+
+    def _goto(self, x, y):
+        """ Move to x, y, with all the same side effects as RawTurtle. """
+        self._x = x
+        self._y = y
+        if self._drawing:
+            line = self._line
+            line.append(x * 1.0)
+            line.append(-y * 1.0)
+            if len(line) > 2*MAX_LINE_POINTS:
+                self._new_line()
+        if self._fill_path is not None:
+            self._fill_path.append((x, y))
+
+    # Pen and colours
+
+    def pen(self, pen=None, **pendict):
+        if not (pen or pendict):
+            return {"shown": self._shown,
+                    "pendown": self._drawing,
+                    "pencolor": self._pencolor,
+                    "fillcolor": self._fillcolor,
+                    "pensize": self._pensize,
+                    "speed": 0,
+                    "resizemode": self._resizemode,
+                    "stretchfactor": self._stretchfactor,
+                    "shearfactor": 0.0,
+                    "outline": self._outlinewidth,
+                    "tilt": 0.0}
+        if isinstance(pen, dict):
+            p = dict(pen)
+        else:
+            p = {}
+        p.update(pendict)
+        pencolor = p.get("pencolor")
+        fillcolor = p.get("fillcolor")
+        if pencolor is not None:
+            pencolor = self._colorstr((pencolor,))
+        if fillcolor is not None:
+            fillcolor = self._colorstr((fillcolor,))
+
+        if (("pendown" in p and self._drawing != p["pendown"]) or
+                (pencolor is not None and self._pencolor != pencolor) or
+                ("pensize" in p and self._pensize != p["pensize"])):
+            self._new_line()
+        if "pendown" in p:
+            self._drawing = p["pendown"]
+        if pencolor is not None:
+            self._pencolor = pencolor
+        if "pensize" in p:
+            self._pensize = p["pensize"]
+        if fillcolor is not None:
+            self._fillcolor = fillcolor
+        if "resizemode" in p:
+            self._resizemode = p["resizemode"]
+        if "stretchfactor" in p:
+            stretch = p["stretchfactor"]
+            if isinstance(stretch, (int, float)):
+                stretch = (stretch, stretch)
+            self._stretchfactor = stretch
+        if "outline" in p:
+            self._outlinewidth = p["outline"]
+        if "shown" in p:
+            self._shown = p["shown"]
+
+    def _colorstr(self, color):
+        return normalize_color(color, self.screen._colormode)
+
+    def pencolor(self, *args):
+        if not args:
+            return describe_color(self._pencolor)
+        color = self._colorstr(args)
+        if color != self._pencolor:
+            self._new_line()
+            self._pencolor = color
+
+    def fillcolor(self, *args):
+        if not args:
+            return describe_color(self._fillcolor)
+        self._fillcolor = self._colorstr(args)
+
+    def color(self, *args):
+        if not args:
+            return (describe_color(self._pencolor),
+                    describe_color(self._fillcolor))
+        if len(args) == 1:
+            pcolor = fcolor = args[0]
+        elif len(args) == 2:
+            pcolor, fcolor = args
+        else:
+            pcolor = fcolor = args
+        self.pen(pencolor=self._colorstr(pcolor),
+                 fillcolor=self._colorstr(fcolor))
+
+    def pensize(self, width=None):
+        if width is None:
+            return self._pensize
+        if width != self._pensize:
+            self._new_line()
+            self._pensize = width
+
+    width = pensize
+
+    def penup(self):
+        if self._drawing:
+            self.pen(pendown=False)
+
+    pu = up = penup
+
+    def pendown(self):
+        if not self._drawing:
+            self.pen(pendown=True)
+
+    pd = down = pendown
+
+    def isdown(self):
+        return self._drawing
+
+    def speed(self, speed=None):
+        if speed is None:
+            return 0
+
+    def showturtle(self):
+        self._shown = True
+
+    st = showturtle
+
+    def hideturtle(self):
+        self._shown = False
+
+    ht = hideturtle
+
+    def isvisible(self):
+        return self._shown
+
+    def shape(self, name=None):
+        if name is None:
+            return self._shape
+        if name not in SHAPES:
+            raise TurtleGraphicsError("There is no shape named %s" % name)
+        self._shape = name
+
+    def resizemode(self, rmode=None):
+        if rmode is None:
+            return self._resizemode
+        rmode = rmode.lower()
+        if rmode in ("auto", "user", "noresize"):
+            self.pen(resizemode=rmode)
+
+    def shapesize(self, stretch_wid=None, stretch_len=None, outline=None):
+        if stretch_wid is stretch_len is outline is None:
+            stretch_wid, stretch_len = self._stretchfactor
+            return stretch_wid, stretch_len, self._outlinewidth
+        if stretch_wid is not None:
+            if stretch_len is None:
+                stretch_len = stretch_wid
+            stretchfactor = stretch_wid, stretch_len
+        elif stretch_len is not None:
+            stretchfactor = self._stretchfactor[0], stretch_len
+        else:
+            stretchfactor = self._stretchfactor
+        if outline is None:
+            outline = self._outlinewidth
+        self.pen(resizemode="user",
+                 stretchfactor=stretchfactor,
+                 outline=outline)
+
+    turtlesize = shapesize
+
+    # Drawing
+
+    def begin_fill(self):
+        if self._fill_path is None:
+            self._fill_item = self._create_polygon()
+            self._items.append(self._fill_item)
+        self._fill_path = [(self._x, self._y)]
+        self._new_line()
+
+    def end_fill(self):
+        if self._fill_path is None:
+            return
+        if len(self._fill_path) > 2:
+            cv = self.screen.cv
+            cv.coords(self._fill_item, *self._flatten(self._fill_path))
+            cv.itemconfigure(self._fill_item, fill=self._fillcolor)
+        self._fill_item = self._fill_path = None
+
+    def filling(self):
+        return self._fill_path is not None
+
+    def dot(self, size=None, *color):
+        if not color:
+            if isinstance(size, (str, tuple)):
+                color = self._colorstr(size)
+                size = self._pensize + max(self._pensize, 4)
+            else:
+                color = self._pencolor
+                if not size:
+                    size = self._pensize + max(self._pensize, 4)
+        else:
+            if size is None:
+                size = self._pensize + max(self._pensize, 4)
+            color = self._colorstr(color)
+        if self.native_arcs:
+            x = self._x * 1.0
+            y = -self._y * 1.0
+            radius = size / 2
+            self._add_above_line(self.screen.cv.create_oval(x - radius,
+                                                            y - radius,
+                                                            x + radius,
+                                                            y + radius,
+                                                            fill=color,
+                                                            outline=''))
+            return
+        # Same as RawTurtle: a line of no length, with round caps.
+        pen = self.pen()
+        try:
+            if self._resizemode == 'auto':
+                self.hideturtle()
+            self.pendown()
+            self.pensize(size)
+            self.pencolor(color)
+            self.forward(0)
+        finally:
+            self.pen(pen)
+
+    def stamp(self):
+        cv = self.screen.cv
+        polygon = SHAPES[self._shape]
+        if polygon is None:
+            item = cv.create_image(0, 0, image='')
+        else:
+            if self._resizemode == "noresize":
+                width = 1
+            elif self._resizemode == "auto":
+                width = self._pensize
+            else:
+                width = self._outlinewidth
+            item = self._create_polygon()
+            polygon = self._resize_shape(polygon)
+            points = self._shape_points(polygon)
+            cv.coords(item, *self._flatten(points))
+            cv.itemconfigure(item, fill=self._fillcolor)
+            cv.itemconfigure(item, outline=self._pencolor)
+            cv.itemconfigure(item, width=width)
+            cv.tag_raise(item)
+            e0, e1 = self._unit_orient()
+            cv.set_symbol(item, polygon, (e1, e0, e0, -e1, self._x, -self._y))
+        self._stamp_items[item] = None
+        return item
+
+    def _resize_shape(self, polygon):
+        """ Scale a shape to the turtle's size. """
+        if self._resizemode != "noresize":
+            if self._resizemode == "user":
+                scale_x, scale_y = self._stretchfactor
+                t11, t12, t21, t22 = (scale_x*1.0, scale_y*(0.0*1.0 + 0.0),
+                                      -scale_x*0.0, scale_y*(1.0 - 0.0*0.0))
+            else:
+                scale = max(1, self._pensize/5.0)
+                t11, t12, t21, t22 = scale, 0, 0, scale
+            polygon = tuple((t11*x + t12*y, t21*x + t22*y)
+                            for (x, y) in polygon)
+        return polygon
+
+    def _unit_orient(self):
+        e0, e1 = self._orient_x, self._orient_y
+        length = math.hypot(e0, e1)
+        return e0 * (1.0/length), e1 * (1.0/length)
+
+    def _shape_points(self, polygon):
+        """ Rotate a resized shape to the turtle's heading and position. """
+        p0, p1 = self._x, self._y
+        e0, e1 = self._unit_orient()
+        return [(p0+(e1*x+e0*y)/1.0, p1+(-e0*x+e1*y)/1.0)
+                for (x, y) in polygon]
+
+    def clearstamp(self, stampid):
+        if self._stamp_items.pop(stampid, False) is None:
+            self.screen.cv.delete(stampid)
+
+    def clearstamps(self, n=None):
+        stamp_ids = list(self._stamp_items)
+        if n is None:
+            pass
+        elif n >= 0:
+            stamp_ids = stamp_ids[:n]
+        else:
+            stamp_ids = stamp_ids[n:]
+        for stamp_id in stamp_ids:
+            self.clearstamp(stamp_id)
+
+    def write(self,
+              arg,
+              move=False,
+              align="left",
+              font=DEFAULT_FONT):
+        if move:
+            raise NotImplementedError('move parameter is not supported.')
+        item = self.screen.cv.create_text(self._x * 1.0 - 1,
+                                          -(self._y * 1.0),
+                                          text=str(arg),
+                                          anchor=TEXT_ANCHORS[align.lower()],
+                                          fill=self._pencolor,
+                                          font=normalize_font(font))
+        self._items.append(item)
+
+    def clear(self):
+        cv = self.screen.cv
+        self._fill_item = self._fill_path = None
+        for item in self._items:
+            cv.delete(item)
+        self._line_item = self._create_line()
+        self._items = [self._line_item]
+        self._line = [self._x * 1.0, -self._y * 1.0] if self._drawing else []
+        self._line_sent = len(self._line)
+        self.clearstamps()
+
+    def reset(self):
+        self._x = self._y = 0.0
+        self._orient_x, self._orient_y = 1.0, 0.0
+        self._reset_pen()
+        self.clear()
+
+    def undo(self):
+        raise NotImplementedError('undo is not supported, use SvgTurtle.')
+
+    # Canvas items
+
+    def _create_line(self):
+        return self.screen.cv.create_line(0, 0, 0, 0,
+                                          fill="",
+                                          width=2,
+                                          capstyle='round')
+
+    def _create_polygon(self):
+        return self.screen.cv.create_polygon((0, 0, 0, 0, 0, 0),
+                                             fill="",
+                                             outline="")
+
+    @staticmethod
+    def _flatten(points):
+        coords = []
+        for x, y in points:
+            coords.append(x * 1.0)
+            coords.append(-y * 1.0)
+        return coords
+
+    def _new_line(self):
+        """ Finish the current line item and start a new one. """
+        if len(self._line) > 2:
+            self._send_line()
+            self._line_item = self._create_line()
+            self._items.append(self._line_item)
+        else:
+            self.screen.cv.tag_raise(self._line_item)
+        self._line = [self._x * 1.0, -self._y * 1.0]
+        self._line_sent = 2
+
+    def _add_above_line(self, item):
+        """ Add an item above the current line, and start a new line above it,
+        the same as SvgTurtle.
+        """
+        self._send_line()
+        self._items.append(item)
+        self._line_item = self._create_line()
+        self._items.append(self._line_item)
+        self._line = [self._x * 1.0, -self._y * 1.0]
+        self._line_sent = 2
+
+    def _send_line(self):
+        """ Copy the current line's new points to the canvas. """
+        line = self._line
+        if len(line) <= self._line_sent:
+            return
+        cv = self.screen.cv
+        cv.coords(self._line_item, *line)
+        cv.itemconfigure(self._line_item,
+                         fill=self._pencolor,
+                         width=self._pensize)
+        self._line_sent = len(line)
+
+    # Export
+
+    def _get_export_canvas(self) -> Canvas:
+        self._send_line()
+        return self.screen.cv
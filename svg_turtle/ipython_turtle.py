@@ -11,6 +11,8 @@ class IPythonTurtle(SvgTurtle):
     if display is None:
       raise ImportError("Could not import required dependency IPython.display")
     super().__init__(*args)
+    # Notebooks redisplay the same drawing, so keep the unchanged elements.
+    self.getscreen().cv.cache_fragments = True
 
   def _repr_svg_(self):
     return self.to_svg()
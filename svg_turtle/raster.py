@@ -0,0 +1,136 @@
+import typing
+
+from .canvas import ExportBackend
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:
+    Image = ImageDraw = ImageFont = None
+
+TEXT_ANCHORS = dict(start='ls', middle='ms', end='rs')
+
+
+class PillowBackend(ExportBackend):
+    """ Draw canvas items straight onto a Pillow image, without any SVG.
+
+    :param scale: output pixels per SVG unit
+    :param supersample: draw this many times larger, then shrink the image
+        to smooth the edges
+    """
+    def __init__(self, scale: float = 1.0, supersample: int = 1):
+        if Image is None:
+            raise ImportError("Could not import required dependency PIL.")
+        self.scale = scale
+        self.supersample = supersample
+        self.factor = scale * supersample
+        self.size = (0, 0)
+        self.image = self.draw = None
+        self.fonts = {}
+
+    def start(self, width: int, height: int, bgcolor: typing.Optional[str]):
+        self.size = (round(width * self.scale), round(height * self.scale))
+        full_size = (self.size[0] * self.supersample,
+                     self.size[1] * self.supersample)
+        self.image = Image.new('RGBA', full_size, bgcolor or (0, 0, 0, 0))
+        self.draw = ImageDraw.Draw(self.image)
+
+    def scale_points(self, coords: typing.Sequence[float]):
+        factor = self.factor
+        return [((coords[i] - 0.5) * factor, (coords[i+1] - 0.5) * factor)
+                for i in range(0, len(coords), 2)]
+
+    def line_width(self, width) -> int:
+        """ Scale a stroke width to pixels, or 0 for no stroke.
+
+        Like SVG, a missing width means 1, and a width of 0 draws nothing.
+        """
+        if width is None or width == '':
+            width = 1
+        width = float(width)
+        if width <= 0:
+            return 0
+        return max(1, round(width * self.factor))
+
+    def add_line(self, coords: typing.Sequence[float], color: str, width):
+        if not color:
+            return
+        pixel_width = self.line_width(width)
+        if not pixel_width:
+            return
+        points = self.scale_points(coords)
+        self.draw.line(points, fill=color, width=pixel_width, joint='curve')
+        if pixel_width > 2:
+            # Round caps, to match stroke-linecap in the SVG.
+            radius = pixel_width / 2
+            for x, y in (points[0], points[-1]):
+                self.draw.ellipse((x - radius, y - radius,
+                                   x + radius, y + radius),
+                                  fill=color)
+
+    def add_polygon(self,
+                    coords: typing.Sequence[float],
+                    fill: str,
+                    outline: str,
+                    width):
+        points = self.scale_points(coords)
+        if len(points) < 2:
+            return
+        pixel_width = self.line_width(width) if outline else 0
+        if not pixel_width:
+            outline = None
+        try:
+            self.draw.polygon(points,
+                              fill=fill or None,
+                              outline=outline or None,
+                              width=pixel_width)
+        except TypeError:
+            # Older Pillow has no width for polygon outlines, so draw it as
+            # a line instead.
+            self.draw.polygon(points, fill=fill or None)
+            if outline:
+                self.draw.line(points + points[:1],
+                               fill=outline,
+                               width=pixel_width,
+                               joint='curve')
+
+    def add_text(self,
+                 x: float,
+                 y: float,
+                 text: str,
+                 font: typing.Tuple[str, float, str],
+                 anchor: str,
+                 color: str):
+        (x, y), = self.scale_points((x, y))
+        self.draw.text((x, y),
+                       text,
+                       fill=color,
+                       font=self.load_font(font),
+                       anchor=TEXT_ANCHORS[anchor])
+
+    def load_font(self, font: typing.Tuple[str, float, str]):
+        font_name, font_size, font_style = font
+        size = max(1, round(font_size * self.factor))
+        key = (font_name, size, font_style)
+        loaded_font = self.fonts.get(key)
+        if loaded_font is None:
+            file_name = font_name.lower()
+            if 'bold' in font_style:
+                file_name += 'bd'
+            try:
+                loaded_font = ImageFont.truetype(file_name + '.ttf', size)
+            except OSError:
+                # No such font installed, so fall back to Pillow's own.
+                try:
+                    loaded_font = ImageFont.load_default(size)
+                except TypeError:
+                    # Before Pillow 10.1, the default font had one size.
+                    loaded_font = ImageFont.load_default()
+            self.fonts[key] = loaded_font
+        return loaded_font
+
+    def finish(self) -> 'Image.Image':
+        image = self.image
+        if self.supersample > 1:
+            image = image.resize(self.size, Image.LANCZOS)
+        self.image = self.draw = None
+        return image
@@ -0,0 +1,452 @@
+""" Serve SVG drawings over HTTP from a pool of warm worker processes.
+
+Start it with python -m svg_turtle.serve, then POST a JSON job to /render,
+like {"script": "t.forward(100)", "width": 200, "height": 100}, to get
+the SVG back. Instead of a script, send {"function": "module:name"} to call
+a drawing function that the workers can import. GET /metrics for counts,
+throughput, and latency. Jobs run arbitrary code, so only serve on a
+trusted network.
+"""
+import json
+import math
+import os
+import signal
+import threading
+import time
+import traceback
+import typing
+from argparse import ArgumentParser
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from importlib import import_module
+
+from .batch import Job, run_job
+from .svg_writer import SvgOptions
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_MAX_QUEUE = 100
+# Extra seconds to wait for a worker to report a timeout, before giving up.
+TIMEOUT_GRACE = 1.0
+# How many recent jobs the latency and throughput metrics cover.
+METRIC_SAMPLES = 1000
+THROUGHPUT_SECONDS = 60.0
+
+
+class JobTimeout(BaseException):
+    """ Raised in a worker when a job runs past its deadline.
+
+    It isn't an Exception, so a script that catches Exception can't hide it.
+    """
+
+
+class ServiceBusy(Exception):
+    """ Raised when the queue of waiting jobs is full. """
+
+
+@dataclass
+class RenderResult:
+    """ What happened to one job.
+
+    :param svg: the drawing, or None if the job failed
+    :param seconds: time spent drawing in the worker
+    :param error: the traceback or message, if the job failed
+    :param timed_out: True if the job missed its deadline
+    """
+    svg: typing.Optional[str]
+    seconds: float
+    error: typing.Optional[str] = None
+    timed_out: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.svg is not None
+
+
+def warm_up():
+    """ Import and run everything a job needs, so each job doesn't pay. """
+    import svgwrite  # noqa: F401
+
+    from .colors import color_map  # noqa: F401
+
+    t = run_job('t.forward(1)', 10, 10)
+    t.to_svg()
+
+
+def load_job(kind: str, value: str) -> Job:
+    """ Turn a request's job into script text or a drawing function.
+
+    :param kind: 'script' or 'function'
+    :param value: the script text, or 'module:name' for a function
+    """
+    if kind == 'script':
+        return value
+    module_name, _, function_name = value.partition(':')
+    return getattr(import_module(module_name), function_name)
+
+
+@contextmanager
+def time_limit(deadline: float):
+    """ Raise JobTimeout in the main thread when time.time() passes deadline.
+
+    Without SIGALRM, as on Windows, the worker can't stop a job early, but
+    the service still stops waiting for it.
+    """
+    seconds = deadline - time.time()
+    if seconds <= 0:
+        raise JobTimeout()
+    if not hasattr(signal, 'setitimer'):
+        yield
+        return
+
+    def handle_alarm(signum, frame):
+        raise JobTimeout()
+
+    old_handler = signal.signal(signal.SIGALRM, handle_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, old_handler)
+
+
+def render_svg(kind: str,
+               value: str,
+               width: int,
+               height: int,
+               options: dict,
+               deadline: float) -> RenderResult:
+    """ Draw a job in a worker process, and return its SVG.
+
+    :param deadline: the time.time() to give up at, including the time the
+        job spent waiting in the queue
+    """
+    start = time.perf_counter()
+    try:
+        with time_limit(deadline):
+            t = run_job(load_job(kind, value), width, height)
+            svg = t.to_svg(**options)
+    except JobTimeout:
+        return RenderResult(None,
+                            time.perf_counter() - start,
+                            'The job missed its deadline.',
+                            timed_out=True)
+    except Exception:
+        return RenderResult(None,
+                            time.perf_counter() - start,
+                            traceback.format_exc())
+    return RenderResult(svg, time.perf_counter() - start)
+
+
+class RenderService:
+    """ Draw jobs in a pool of worker processes, and keep metrics.
+
+    The workers import everything when they start, so each job only pays
+    for its own drawing. Jobs wait in a queue when all the workers are busy.
+    :param workers: the number of worker processes, defaults to the number
+        of CPUs
+    :param max_queue: how many jobs can wait for a worker before new ones
+        are rejected
+    :param timeout: the longest a job can take, in seconds, including the
+        time it waits in the queue
+    """
+    def __init__(self,
+                 workers: int = None,
+                 max_queue: int = DEFAULT_MAX_QUEUE,
+                 timeout: float = DEFAULT_TIMEOUT):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.pending = 0  # Jobs that are queued or running.
+        self.futures: typing.Set[Future] = set()
+        self.counts: typing.Dict[str, int] = Counter()
+        # (finish time, latency, worker seconds) for recent jobs.
+        self.samples: typing.Deque[typing.Tuple[float, float, float]] = deque(
+            maxlen=METRIC_SAMPLES)
+        self.start_time = time.monotonic()
+        self.executor = self.start_pool()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def start_pool(self) -> ProcessPoolExecutor:
+        executor = ProcessPoolExecutor(self.workers, initializer=warm_up)
+        # Start all the workers now, instead of when the first jobs arrive.
+        futures = [executor.submit(os.getpid) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+        return executor
+
+    def close(self):
+        # shutdown(cancel_futures=True) needs Python 3.9, so cancel them here.
+        with self.lock:
+            futures = list(self.futures)
+        for future in futures:
+            future.cancel()
+        self.executor.shutdown()
+
+    def render(self, request: dict) -> RenderResult:
+        """ Draw a job, waiting for a worker if they're all busy.
+
+        :param request: a dict with either script text or a 'module:name'
+            function, and optionally width, height, timeout in seconds, and
+            options for to_svg()
+        :raises ValueError: if the request isn't valid
+        :raises ServiceBusy: if the queue is full
+        """
+        kind, value = parse_job(request)
+        width = int(read_number(request, 'width', 400))
+        height = int(read_number(request, 'height', 250))
+        options = request.get('options') or {}
+        if not isinstance(options, dict):
+            raise ValueError('Options must be an object.')
+        try:
+            SvgOptions(**options)
+        except TypeError as ex:
+            raise ValueError(str(ex)) from ex
+        timeout = min(read_number(request, 'timeout', self.timeout),
+                      self.timeout)
+        with self.lock:
+            if self.pending >= self.workers + self.max_queue:
+                self.counts['rejected'] += 1
+                raise ServiceBusy('Too many jobs are waiting.')
+            self.pending += 1
+        start = time.perf_counter()
+        try:
+            result = self.run(kind, value, width, height, options, timeout)
+        finally:
+            with self.lock:
+                self.pending -= 1
+        latency = time.perf_counter() - start
+        with self.lock:
+            if result.ok:
+                self.counts['completed'] += 1
+            elif result.timed_out:
+                self.counts['timed_out'] += 1
+            else:
+                self.counts['failed'] += 1
+            self.samples.append((time.monotonic(), latency, result.seconds))
+        return result
+
+    def run(self,
+            kind: str,
+            value: str,
+            width: int,
+            height: int,
+            options: dict,
+            timeout: float) -> RenderResult:
+        executor = self.executor
+        deadline = time.time() + timeout
+        try:
+            future = executor.submit(render_svg,
+                                     kind,
+                                     value,
+                                     width,
+                                     height,
+                                     options,
+                                     deadline)
+            with self.lock:
+                self.futures.add(future)
+            try:
+                return future.result(timeout + TIMEOUT_GRACE)
+            finally:
+                with self.lock:
+                    self.futures.discard(future)
+        except FutureTimeoutError:
+            # A queued job is dropped, but a stuck worker keeps running.
+            future.cancel()
+            return RenderResult(None,
+                                timeout,
+                                'The job missed its deadline.',
+                                timed_out=True)
+        except BrokenProcessPool:
+            self.restart_pool(executor)
+            return RenderResult(None, 0.0, 'A worker process died.')
+
+    def restart_pool(self, broken_executor: ProcessPoolExecutor):
+        """ Replace a pool after a worker died, unless it's already done. """
+        with self.lock:
+            if self.executor is not broken_executor:
+                return
+            self.counts['worker_restarts'] += 1
+            # A broken pool has already failed all of its jobs.
+            broken_executor.shutdown(wait=False)
+            self.executor = self.start_pool()
+
+    def metrics(self) -> typing.Dict[str, typing.Any]:
+        """ Counts of jobs, plus throughput and latency for recent jobs.
+
+        Latency is the time from receiving a job to finishing it, including
+        the queue, and run_seconds is the time the worker spent drawing.
+        """
+        now = time.monotonic()
+        with self.lock:
+            samples = list(self.samples)
+            metrics = dict(workers=self.workers,
+                           max_queue=self.max_queue,
+                           pending=self.pending,
+                           uptime_seconds=now - self.start_time,
+                           completed=0,
+                           failed=0,
+                           timed_out=0,
+                           rejected=0,
+                           worker_restarts=0)
+            metrics.update(self.counts)
+        window = min(THROUGHPUT_SECONDS, metrics['uptime_seconds'])
+        recent_count = sum(1
+                           for finish_time, _, _ in samples
+                           if now - finish_time <= window)
+        metrics['jobs_per_second'] = recent_count / window if window else 0.0
+        latencies = sorted(latency for _, latency, _ in samples)
+        run_times = [seconds for _, _, seconds in samples]
+        metrics['latency_p50_seconds'] = percentile(latencies, 0.5)
+        metrics['latency_p95_seconds'] = percentile(latencies, 0.95)
+        metrics['latency_max_seconds'] = latencies[-1] if latencies else None
+        metrics['mean_run_seconds'] = (sum(run_times) / len(run_times)
+                                       if run_times else None)
+        return metrics
+
+
+def parse_job(request: dict) -> typing.Tuple[str, str]:
+    """ Find the job in a request, as ('script', text) or ('function', name).
+    """
+    if not isinstance(request, dict):
+        raise ValueError('The request must be a JSON object.')
+    found = [(kind, request[kind])
+             for kind in ('script', 'function')
+             if kind in request]
+    if len(found) != 1:
+        raise ValueError('Send either a script or a function.')
+    kind, value = found[0]
+    if not isinstance(value, str):
+        raise ValueError(f'The {kind} must be a string.')
+    if kind == 'function' and ':' not in value:
+        raise ValueError("The function must look like 'module:name'.")
+    return kind, value
+
+
+def read_number(request: dict, name: str, default: float) -> float:
+    """ Read a positive number from a request, or use the default. """
+    value = request.get(name, default)
+    if (isinstance(value, bool) or
+            not isinstance(value, (int, float)) or
+            not 0 < value < math.inf):
+        raise ValueError(f'The {name} must be a positive number.')
+    return value
+
+
+def percentile(sorted_values: typing.Sequence[float],
+               fraction: float) -> typing.Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    """ POST /render to draw a job, and GET /metrics for the metrics. """
+    server: 'RenderServer'
+
+    def do_GET(self):
+        if self.path == '/metrics':
+            self.send_json(200, self.server.service.metrics())
+        else:
+            self.send_json(404, dict(error='Not found.'))
+
+    def do_POST(self):
+        if self.path != '/render':
+            self.send_json(404, dict(error='Not found.'))
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length))
+            result = self.server.service.render(request)
+        except ValueError as ex:
+            self.send_json(400, dict(error=str(ex)))
+            return
+        except ServiceBusy as ex:
+            self.send_json(503, dict(error=str(ex)))
+            return
+        if result.ok:
+            self.send_text(200, 'image/svg+xml', result.svg)
+        elif result.timed_out:
+            self.send_json(504, dict(error=result.error))
+        else:
+            self.send_json(500, dict(error=result.error))
+
+    def send_json(self, status: int, content: dict):
+        self.send_text(status, 'application/json', json.dumps(content))
+
+    def send_text(self, status: int, content_type: str, text: str):
+        body = text.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type + '; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class RenderServer(ThreadingHTTPServer):
+    """ An HTTP server that sends each job to a RenderService.
+
+    Each request waits for its job in its own thread.
+    """
+    daemon_threads = True
+
+    def __init__(self, address, service: RenderService, quiet=False):
+        super().__init__(address, RenderRequestHandler)
+        self.service = service
+        self.quiet = quiet
+
+
+def main():
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers',
+                        type=int,
+                        help='worker processes, default is the number of CPUs')
+    parser.add_argument('--max-queue',
+                        type=int,
+                        default=DEFAULT_MAX_QUEUE,
+                        help='jobs that can wait for a worker')
+    parser.add_argument('--timeout',
+                        type=float,
+                        default=DEFAULT_TIMEOUT,
+                        help='maximum seconds for each job, including the '
+                             'queue')
+    parser.add_argument('--quiet',
+                        action='store_true',
+                        help="don't log each request")
+    args = parser.parse_args()
+
+    with RenderService(args.workers, args.max_queue, args.timeout) as service:
+        with RenderServer((args.host, args.port),
+                          service,
+                          args.quiet) as server:
+            host, port = server.server_address[:2]
+            print(f'Serving on http://{host}:{port}/render with '
+                  f'{service.workers} workers.', flush=True)
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+
+
+if __name__ == '__main__':
+    main()
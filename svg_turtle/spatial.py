@@ -0,0 +1,124 @@
+import typing
+from math import floor
+
+# x1, y1, x2, y2, with x1 <= x2 and y1 <= y2.
+Bounds = typing.Tuple[float, float, float, float]
+
+DEFAULT_CELL_SIZE = 64
+# Items that would touch more cells than this go in a list that every query
+# checks, so one huge item can't fill the grid.
+MAX_ITEM_CELLS = 64
+
+
+class GridIndex:
+    """ Find items by bounding box, using a grid of square cells.
+
+    Each item is listed in every cell that its bounding box touches, so a
+    query only has to check the items in the cells that it touches. Items
+    that would touch more than MAX_ITEM_CELLS cells are listed separately,
+    and every query returns them.
+    """
+    def __init__(self, cell_size: float = DEFAULT_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells: typing.Dict[typing.Tuple[int, int], typing.Set[int]] = {}
+        # The range of cells, (i1, j1, i2, j2), that each item is listed in.
+        self.item_cells: typing.Dict[int, typing.Tuple[int, int, int, int]] = {}
+        self.large_items: typing.Set[int] = set()
+
+    def __len__(self):
+        return len(self.item_cells)
+
+    def cell_range(self, bounds: Bounds) -> typing.Tuple[int, int, int, int]:
+        cell_size = self.cell_size
+        x1, y1, x2, y2 = bounds
+        return (floor(x1 / cell_size),
+                floor(y1 / cell_size),
+                floor(x2 / cell_size),
+                floor(y2 / cell_size))
+
+    def add(self, item: int, bounds: Bounds):
+        cell_range = self.cell_range(bounds)
+        self.item_cells[item] = cell_range
+        i1, j1, i2, j2 = cell_range
+        if (i2-i1+1) * (j2-j1+1) > MAX_ITEM_CELLS:
+            self.large_items.add(item)
+            return
+        cells = self.cells
+        for i in range(i1, i2+1):
+            for j in range(j1, j2+1):
+                cell = cells.get((i, j))
+                if cell is None:
+                    cells[i, j] = {item}
+                else:
+                    cell.add(item)
+
+    def remove(self, item: int):
+        cell_range = self.item_cells.pop(item, None)
+        if cell_range is None:
+            return
+        if item in self.large_items:
+            self.large_items.remove(item)
+            return
+        cells = self.cells
+        i1, j1, i2, j2 = cell_range
+        for i in range(i1, i2+1):
+            for j in range(j1, j2+1):
+                cell = cells[i, j]
+                cell.discard(item)
+                if not cell:
+                    del cells[i, j]
+
+    def update(self, item: int, bounds: typing.Optional[Bounds]):
+        """ Move an item to new bounds, or remove it if bounds is None. """
+        if bounds is None:
+            self.remove(item)
+        elif self.item_cells.get(item) != self.cell_range(bounds):
+            self.remove(item)
+            self.add(item, bounds)
+
+    def candidates(self, bounds: Bounds) -> typing.Set[int]:
+        """ Find the items listed in any cell that bounds touches.
+
+        The caller still has to check each item's own bounds.
+        """
+        found = set(self.large_items)
+        cells = self.cells
+        i1, j1, i2, j2 = self.cell_range(bounds)
+        if (i2-i1+1) * (j2-j1+1) > len(cells):
+            # The query covers more cells than are in use.
+            for (i, j), cell in cells.items():
+                if i1 <= i <= i2 and j1 <= j <= j2:
+                    found.update(cell)
+            return found
+        for i in range(i1, i2+1):
+            for j in range(j1, j2+1):
+                cell = cells.get((i, j))
+                if cell is not None:
+                    found.update(cell)
+        return found
+
+
+def find_bounds(coords: typing.Sequence[float]) -> typing.Optional[Bounds]:
+    """ Find the bounding box of flat x, y coordinates, or None if empty. """
+    if len(coords) < 2:
+        return None
+    xs = coords[0::2]
+    ys = coords[1::2]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def combine_bounds(bounds1: Bounds, bounds2: Bounds) -> Bounds:
+    return (min(bounds1[0], bounds2[0]),
+            min(bounds1[1], bounds2[1]),
+            max(bounds1[2], bounds2[2]),
+            max(bounds1[3], bounds2[3]))
+
+
+def overlaps(bounds1: Bounds, bounds2: Bounds) -> bool:
+    return (bounds1[0] <= bounds2[2] and bounds2[0] <= bounds1[2] and
+            bounds1[1] <= bounds2[3] and bounds2[1] <= bounds1[3])
+
+
+def encloses(outer: Bounds, inner: Bounds) -> bool:
+    return (outer[0] <= inner[0] and inner[2] <= outer[2] and
+            outer[1] <= inner[1] and inner[3] <= outer[3])
@@ -0,0 +1,129 @@
+import typing
+from collections import Counter, defaultdict
+from time import perf_counter
+
+MISSING = object()
+
+
+class RenderStats:
+    """ Opt-in counters and per-phase timers for a canvas and its turtles.
+
+    Nothing is measured until wrap() replaces an object's methods with timed
+    versions, so there's no cost when profiling is off. Each phase's time
+    excludes the phases nested inside it, so the phases add up to the total
+    time spent in wrapped methods.
+    """
+    def __init__(self, callback: typing.Callable[[dict], typing.Any] = None):
+        """ Initialize.
+
+        :param callback: called with as_dict() after each export
+        """
+        self.callback = callback
+        self.counts: typing.Dict[str, int] = Counter()
+        self.seconds: typing.Dict[str, float] = defaultdict(float)
+        # Time spent in nested phases, for each wrapped call in progress.
+        self.nested_seconds: typing.List[float] = []
+        self.wrapped: typing.List[typing.Tuple[object, str, object]] = []
+
+    def timed(self,
+              method: typing.Callable,
+              phase: str,
+              counter: str = None,
+              min_args: int = 0,
+              is_export: bool = False) -> typing.Callable:
+        """ Wrap a function, so its calls are counted and timed.
+
+        :param method: the function to wrap
+        :param phase: the timer to add the call's time to
+        :param counter: the count to increment for each call, if any
+        :param min_args: only count calls with at least this many positional
+            arguments, like coords() calls that change the coordinates
+        :param is_export: True if the call exports the drawing, so it's
+            counted and reported, unless it's inside another export
+        """
+        counts = self.counts
+        seconds = self.seconds
+        nested_seconds = self.nested_seconds
+
+        def wrapper(*args, **kwargs):
+            if counter is not None and len(args) >= min_args:
+                counts[counter] += 1
+            nested_seconds.append(0.0)
+            start = perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                seconds[phase] += elapsed - nested_seconds.pop()
+                if nested_seconds:
+                    nested_seconds[-1] += elapsed
+                elif is_export:
+                    counts['exports'] += 1
+                    self.report()
+        return wrapper
+
+    def wrap(self,
+             owner: object,
+             method_name: str,
+             phase: str,
+             counter: str = None,
+             min_args: int = 0,
+             is_export: bool = False):
+        """ Replace a method on one object with a timed version.
+
+        See timed() for the parameters. unwrap() restores the method.
+        """
+        # Canvas keeps some methods, like create_line, on the instance.
+        original = vars(owner).get(method_name, MISSING)
+        method = getattr(owner, method_name)
+        setattr(owner,
+                method_name,
+                self.timed(method, phase, counter, min_args, is_export))
+        self.wrapped.append((owner, method_name, original))
+
+    def wrap_turtle(self, turtle):
+        """ Time a turtle's moves and turns as motion, if not already. """
+        if not any(owner is turtle for owner, _, _ in self.wrapped):
+            self.wrap(turtle, '_goto', 'motion', 'moves')
+            self.wrap(turtle, '_rotate', 'motion', 'turns')
+
+    def unwrap(self):
+        """ Restore all the methods that wrap() replaced. """
+        for owner, method_name, original in reversed(self.wrapped):
+            if original is MISSING:
+                delattr(owner, method_name)
+            else:
+                setattr(owner, method_name, original)
+        self.wrapped.clear()
+
+    def wrap_file(self, file: typing.TextIO) -> typing.TextIO:
+        """ Count the characters written to a file, and time the writes. """
+        return CountingFile(file, self)
+
+    def report(self):
+        """ Send the current stats to the callback, if there is one. """
+        if self.callback is not None:
+            self.callback(self.as_dict())
+
+    def reset(self):
+        self.counts.clear()
+        self.seconds.clear()
+
+    def as_dict(self) -> typing.Dict[str, float]:
+        """ All the counts, plus each phase's time as phase_seconds. """
+        stats: typing.Dict[str, float] = dict(self.counts)
+        for phase, seconds in self.seconds.items():
+            stats[phase + '_seconds'] = seconds
+        return stats
+
+
+class CountingFile:
+    """ Pass writes through to a file, timing them as serialisation. """
+    def __init__(self, file: typing.TextIO, stats: RenderStats):
+        self.file = file
+        self.stats = stats
+        self.write = stats.timed(self.write_counted, 'serialisation')
+
+    def write_counted(self, text: str):
+        self.stats.counts['svg_characters'] += len(text)
+        return self.file.write(text)
@@ -0,0 +1,260 @@
+import re
+import sys
+import typing
+from dataclasses import dataclass
+
+SVG_NAMESPACES = (('xmlns', 'http://www.w3.org/2000/svg'),
+                  ('xmlns:ev', 'http://www.w3.org/2001/xml-events'),
+                  ('xmlns:xlink', 'http://www.w3.org/1999/xlink'))
+XML_HEADER = '<?xml version="1.0" encoding="utf-8" ?>\n'
+
+# Before Python 3.13, minidom also escaped quotes in text content.
+ESCAPE_PRETTY_QUOTES = sys.version_info < (3, 13)
+
+TRAILING_ZEROS = re.compile(r'\.0+(?=[ ,]|$)|(\.\d*[1-9])0+(?=[ ,]|$)')
+NEGATIVE_ZERO = re.compile(r'(?<![\d.])-0(?=[ ,]|$)')
+
+
+@dataclass(frozen=True)
+class SvgOptions:
+    """ Choices about how to write SVG, beyond what's on the canvas.
+
+    :param pretty: True for indented output with line breaks
+    :param indent: how many spaces to indent, if pretty is True
+    :param merge_lines: True to combine each run of lines with the same
+        colour and width into a single path element
+    :param precision: number of decimal places to round coordinates to, or
+        None to write them in full
+    :param relative_paths: True to write merged paths with relative commands,
+        which are usually shorter
+    :param cull: True to leave out lines and polygons that are entirely
+        outside the picture, so they couldn't be seen anyway
+    :param stamp_symbols: True to write each stamped shape once, as a symbol,
+        and each stamp as a use element that moves it into place
+    :param group_styles: True to put the elements in a group with the clip
+        path, and each run of elements with the same style in a group with
+        that style, instead of repeating it on every element
+    """
+    pretty: bool = False
+    indent: int = 2
+    merge_lines: bool = False
+    precision: typing.Optional[int] = None
+    relative_paths: bool = False
+    cull: bool = False
+    stamp_symbols: bool = False
+    group_styles: bool = False
+
+
+class SvgWriter:
+    """ Write SVG elements straight to a file object as they are produced.
+
+    The output matches what svgwrite's Drawing.tostring() would produce for
+    the same elements, or Drawing.write(pretty=True) when pretty is set.
+    """
+    def __init__(self, file: typing.TextIO, options: SvgOptions = None):
+        if options is None:
+            options = SvgOptions()
+        self.write = file.write
+        self.options = options
+        self.pretty = pretty = options.pretty
+        self.depth = 0  # How many groups are open.
+        if pretty:
+            self.element_start = '\n' + ' '*options.indent + '<'
+            self.empty_end = '/>'
+        else:
+            self.element_start = '<'
+            self.empty_end = ' />'
+
+    def start(self, width, height, bgcolor=None, symbols=()):
+        """ Write the start of the SVG, up to the first drawing element.
+
+        :param symbols: (id, points) for each polygon symbol to define, with
+            the points already formatted
+        """
+        attribs = [('baseProfile', 'full'),
+                   ('height', height),
+                   ('version', '1.1'),
+                   ('width', width)]
+        if self.pretty:
+            # minidom moves the namespace declarations to the front.
+            attribs[:0] = SVG_NAMESPACES
+        else:
+            attribs.extend(SVG_NAMESPACES)
+        self.write('<svg' + format_attributes(attribs) + '>')
+        if symbols:
+            self.write_symbols(symbols)
+        else:
+            self.write(self.element_start + 'defs' + self.empty_end)
+        if bgcolor:
+            self.add_element('rect', [('fill', bgcolor),
+                                      ('height', '100%'),
+                                      ('width', '100%'),
+                                      ('x', 0),
+                                      ('y', 0)])
+
+    def write_symbols(self, symbols: typing.Iterable[typing.Tuple[str, str]]):
+        """ Write the defs element, with a polygon symbol for each shape. """
+        if self.pretty:
+            indent = ' ' * self.options.indent
+            starts = ['\n' + indent*level + '<' for level in (1, 2, 3)]
+        else:
+            starts = ['<'] * 3
+        parts = [starts[0] + 'defs>']
+        for symbol_id, points in symbols:
+            parts.append(starts[1] + 'symbol' +
+                         format_attributes([('id', symbol_id),
+                                            ('overflow', 'visible')]) +
+                         '>')
+            parts.append(starts[2] + 'polygon' +
+                         format_attributes([('points', points)]) +
+                         self.empty_end)
+            parts.append(starts[1] + '/symbol>')
+        parts.append(starts[0] + '/defs>')
+        self.write(''.join(parts))
+
+    def finish(self):
+        if self.pretty:
+            self.write('\n</svg>\n')
+        else:
+            self.write('</svg>')
+
+    def add_element(self,
+                    tag: str,
+                    attribs: typing.Iterable[typing.Tuple[str, typing.Any]],
+                    text: str = None):
+        """ Write an element.
+
+        :param tag: the element name
+        :param attribs: (name, value) pairs, already sorted by name
+        :param text: the element's text content, if any
+        """
+        self.write(self.format_element(tag, attribs, text))
+
+    def open_group(self,
+                   attribs: typing.Iterable[typing.Tuple[str, typing.Any]]):
+        """ Start a g element, so the next elements go inside it.
+
+        :param attribs: (name, value) pairs, already sorted by name
+        """
+        self.write(self.element_start + 'g' + format_attributes(attribs) + '>')
+        self.depth += 1
+        self.set_indent()
+
+    def close_group(self):
+        self.depth -= 1
+        self.set_indent()
+        self.write(self.element_start + '/g>')
+
+    def set_indent(self):
+        if self.pretty:
+            indent = ' ' * self.options.indent * (self.depth + 1)
+            self.element_start = '\n' + indent + '<'
+
+    def add_path(self,
+                 path_data: typing.Iterable[str],
+                 attribs: typing.Iterable[typing.Tuple[str, typing.Any]]):
+        """ Write a path element, one piece of path data at a time.
+
+        :param path_data: pieces of the d attribute, to join with spaces
+        :param attribs: the other (name, value) pairs, sorted by name
+        """
+        attribs = list(attribs)
+        self.write(self.element_start + 'path' +
+                   format_attributes(attrib
+                                     for attrib in attribs
+                                     if attrib[0] < 'd') +
+                   ' d="')
+        separator = ''
+        for piece in path_data:
+            self.write(separator + piece)
+            separator = ' '
+        self.write('"' +
+                   format_attributes(attrib
+                                     for attrib in attribs
+                                     if attrib[0] > 'd') +
+                   self.empty_end)
+
+    def format_element(self,
+                       tag: str,
+                       attribs: typing.Iterable[typing.Tuple[str, typing.Any]],
+                       text: str = None) -> str:
+        """ Format an element the same way add_element() writes it. """
+        start = self.element_start + tag + format_attributes(attribs)
+        if not text:
+            return start + self.empty_end
+        text = escape_text(text)
+        if self.pretty and ESCAPE_PRETTY_QUOTES and '"' in text:
+            text = text.replace('"', '&quot;')
+        return start + '>' + text + '</' + tag + '>'
+
+
+def format_attributes(attribs: typing.Iterable[typing.Tuple[str, typing.Any]]):
+    """ Format attributes, skipping empty values the way svgwrite does. """
+    parts = []
+    for name, value in attribs:
+        if value is None:
+            continue
+        value = str(value)
+        if value:
+            parts.append(' {}="{}"'.format(name, escape_attribute(value)))
+    return ''.join(parts)
+
+
+def format_points(coords: typing.Sequence[float], precision: int = None):
+    """ Format flat x, y coordinates as an SVG points list.
+
+    :param coords: x, y pairs, flattened into a single sequence
+    :param precision: number of decimal places to round to, or None to
+        write the numbers in full
+    """
+    assert len(coords) % 2 == 0
+    if precision is None:
+        pair_format = '%s,%s'
+    else:
+        pair_format = '%.{0}f,%.{0}f'.format(precision)
+    # One format call for all the points is much faster than one per point.
+    points = ' '.join([pair_format] * (len(coords) // 2)) % tuple(coords)
+    if precision is None:
+        return points
+    return compact_numbers(points)
+
+
+def format_number(value: float, precision: int) -> str:
+    """ Round a number, then format it as compactly as possible. """
+    return compact_numbers('%.*f' % (precision, value))
+
+
+def compact_numbers(text: str) -> str:
+    """ Remove trailing zeros and minus signs on zeros from rounded numbers.
+
+    >>> compact_numbers('1.500,-0.000 100.000,20.050')
+    '1.5,0 100,20.05'
+    """
+    if '.' in text:
+        text = TRAILING_ZEROS.sub(r'\1', text)
+    if '-0' in text:
+        text = NEGATIVE_ZERO.sub('0', text)
+    return text
+
+
+def escape_text(text: str):
+    if '&' in text:
+        text = text.replace('&', '&amp;')
+    if '<' in text:
+        text = text.replace('<', '&lt;')
+    if '>' in text:
+        text = text.replace('>', '&gt;')
+    return text
+
+
+def escape_attribute(text: str):
+    text = escape_text(text)
+    if '"' in text:
+        text = text.replace('"', '&quot;')
+    if '\r' in text:
+        text = text.replace('\r', '&#13;')
+    if '\n' in text:
+        text = text.replace('\n', '&#10;')
+    if '\t' in text:
+        text = text.replace('\t', '&#09;')
+    return text
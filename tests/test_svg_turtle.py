@@ -1,6 +1,15 @@
+import asyncio
+import gzip
+import json
 import re
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from io import StringIO
 from pathlib import Path
+from threading import Thread
+from urllib.error import HTTPError
+from urllib.request import urlopen
 
 import pytest
 from space_tracer import LiveImage, LiveImageDiffer, LivePainter
@@ -9,7 +18,12 @@ from svglib.svglib import svg2rlg
 from reportlab.graphics import renderPM
 
 # Importing TurtleGraphicsError directly from turtle will fail without tkinter.
-from svg_turtle import SvgTurtle, TurtleGraphicsError
+from svg_turtle import FastSvgTurtle, SvgTurtle, TurtleGraphicsError
+from svg_turtle import canvas as canvas_module
+from svg_turtle.async_drawing import draw_async
+from svg_turtle.batch import render_many
+from svg_turtle.serve import RenderServer, RenderService
+from turtle import RawTurtle, Turtle
 
 
 class LiveSvg(LiveImage):
@@ -275,7 +289,9 @@ def test_listen():
      ('gray100', 'white'),
      ('black', 'black'),
      ('pink', 'pink'),
-     ('#00Ff00', 'green1')])
+     ('#00Ff00', 'green1'),
+     ('grey', 'gray'),
+     ('#336699', (0.2, 0.4, 0.6))])
 def test_get_colour(colour_in, colour_out):
     t = SvgTurtle()
     t.pencolor(colour_in)
@@ -298,6 +314,19 @@ def test_bad_colour(colour_in, expected_error):
         t.color(colour_in)
 
 
+def test_cached_colour_modes():
+    t = SvgTurtle()
+    t.pencolor(1, 0, 0)
+    t.fillcolor([0, 1, 0])  # Unhashable, so it can't be cached.
+    colours = t.color()
+    t.getscreen().colormode(255)
+    t.pencolor(1, 0, 0)
+
+    assert colours == ('red', 'green1')
+    assert t.pencolor() == (0.0, 0.0, 0.0)
+    assert t.pen()['pencolor'] == '#010000'
+
+
 def test_pen_dict(image_differ):
     expected = Drawing(size=(300, 200))
     expected.add(expected.line((150.5, 100.5),
@@ -327,3 +356,773 @@ def test_exits():
     t.getscreen().done()
     t.getscreen().bye()
     t.getscreen().exitonclick()
+
+
+def test_extend_line():
+    t = SvgTurtle()
+    for _ in range(5):
+        t.forward(10)
+    t.undo()
+    t.undo()
+    t.left(90)
+    t.forward(10)
+    canvas = t.getscreen().cv
+
+    coords = canvas.coords(t.currentLineItem)
+
+    assert list(coords) == [0, 0, 10, 0, 20, 0, 30, 0, 30, -10]
+
+
+def draw_sampler(t: SvgTurtle):
+    t.getscreen().bgcolor('ivory')
+    t.fillcolor('blue')
+    t.begin_fill()
+    for _ in range(4):
+        t.forward(50)
+        t.right(90)
+    t.end_fill()
+    t.stamp()
+    t.dot(5, 'red')
+    t.write('Tom & "Jerry" <3', align='center')
+
+
+@pytest.mark.parametrize('pretty', [False, True])
+def test_streamed_svg_matches_svgwrite(pretty):
+    t = SvgTurtle(300, 200)
+    draw_sampler(t)
+    canvas = t.getscreen().cv
+
+    svg = canvas.to_svg(pretty=pretty, verify=True)
+
+    assert svg.startswith('<svg ')
+
+
+def test_save_as_pretty(tmp_path):
+    t = SvgTurtle(300, 200)
+    draw_sampler(t)
+    expected_path = tmp_path / 'expected.svg'
+    t.getscreen().cv.to_drawing().saveas(expected_path, pretty=True, indent=4)
+
+    svg_path = tmp_path / 'example.svg'
+    t.save_as(svg_path, pretty=True, indent=4)
+
+    assert svg_path.read_text() == expected_path.read_text()
+
+
+def test_offset_without_numpy(monkeypatch):
+    t = SvgTurtle(300, 200)
+    for i in range(100):
+        t.forward(i % 7)
+        t.left(31)
+    canvas = t.getscreen().cv
+    expected_svg = canvas.to_svg()
+    monkeypatch.setattr(canvas_module, 'np', None)
+
+    svg = canvas.to_svg(verify=True)
+
+    assert svg == expected_svg
+
+
+def test_coordinate_pool():
+    canvas = canvas_module.Canvas()
+    line1 = canvas.create_line(0, 0, 0, 0, fill='', width=2)
+    line2 = canvas.create_line(0, 0, 0, 0, fill='', width=2)
+    for i in range(1000):
+        canvas.extend_coords(line1, [i, 1])
+        canvas.extend_coords(line2, [i, 2])
+    canvas.coords(line1, 5, 6, 7, 8)
+
+    coords1 = canvas.coords(line1)
+    coords2 = canvas.coords(line2)
+
+    assert list(coords1) == [5, 6, 7, 8]
+    assert len(coords2) == 2004
+    assert list(coords2[-4:]) == [998, 2, 999, 2]
+    assert len(canvas.coord_pool) < 3000
+
+
+def test_add_svg_element():
+    t = SvgTurtle(100, 100)
+    t.forward(20)
+    t.stamp()
+    canvas = t.getscreen().cv
+    expected_svg = canvas.to_drawing(precision=1).tostring()
+    drawing = Drawing(size=(100, 100))
+
+    for item in canvas.find_all():
+        canvas.add_svg_element(canvas.items[item], drawing, precision=1)
+
+    assert drawing.tostring() == expected_svg
+    assert canvas_module.build_coordinate_pairs([1, 2, 3, 4]) == [(1, 2),
+                                                                   (3, 4)]
+
+
+def test_shared_attributes():
+    canvas = canvas_module.Canvas()
+    line1 = canvas.create_line(0, 0, 0, 0, fill='', width=2)
+    line2 = canvas.create_line(0, 0, 0, 0, fill='', width=2)
+    assert canvas.items[line1].attribs is canvas.items[line2].attribs
+
+    canvas.itemconfigure(line1, fill='red')
+
+    assert canvas.items[line1].attribs == dict(fill='red', width=2)
+    assert canvas.items[line2].attribs == dict(fill='', width=2)
+
+
+def test_shared_attributes_released():
+    t = SvgTurtle()
+    canvas = t.getscreen().cv
+    for frame in range(200):
+        t.clear()
+        t.pencolor(frame / 200, 0, 0)
+        t.forward(10)
+        t.write(frame)
+
+    text_item = canvas.find_all()[-1]
+
+    assert len(canvas.attribs_pool) <= len(canvas.items)
+    assert canvas.type(text_item) == 'text'
+    assert canvas.items[text_item].attribs not in canvas.attribs_pool.values()
+
+
+def test_deleted_items():
+    t = SvgTurtle()
+    canvas = t.getscreen().cv
+    start_deleted = canvas.item_stats()['deleted_items']
+    stamp_ids = [t.stamp() for _ in range(10)]
+    for stamp_id in stamp_ids[:-1]:
+        t.clearstamp(stamp_id)
+    last_stamp = stamp_ids[-1]
+
+    stats = canvas.item_stats()
+
+    assert stats['deleted_items'] == start_deleted + 9
+    assert stats['live_items'] == len(canvas.find_all())
+    assert last_stamp in canvas.find_all()
+    assert canvas.type(last_stamp) == 'polygon'
+    assert canvas.coords(stamp_ids[0]) == ()
+
+
+def test_paint_order():
+    canvas = canvas_module.Canvas()
+    item_ids = [canvas.create_line(i, 0, i, 1, fill='black', width=1)
+                for i in range(3000)]
+    for item_id in item_ids[:2000]:
+        canvas.delete(item_id)
+    canvas.tag_raise(item_ids[2000])
+    canvas.tag_raise(item_ids[2001])
+
+    painted_ids = [int(item.coords[0]) for item in canvas.painted_items()]
+
+    assert painted_ids[:4] == [2002, 2000, 2001, 2003]
+    assert len(painted_ids) == 1000
+    assert len(canvas.paint_order) < 3000
+
+
+def test_cached_fragments():
+    t = SvgTurtle(300, 200)
+    canvas = t.getscreen().cv
+    canvas.cache_fragments = True
+    draw_sampler(t)
+    t.to_svg()
+    t.pencolor('red')
+    t.forward(20)
+    t.undo()
+    t.begin_fill()
+    t.circle(20)
+    t.end_fill()
+    t.to_svg()
+    canvas.config(width=400)
+    svg = t.to_svg()
+    canvas.cache_fragments = False
+    canvas.clear_fragments()
+
+    expected_svg = t.to_svg()
+
+    assert svg == expected_svg
+
+
+@pytest.mark.parametrize('merge_lines', [False, True])
+def test_cached_fragments_turned_off(merge_lines):
+    t = SvgTurtle(300, 200)
+    t.forward(60.623456)
+    t.write('a')
+    canvas = t.getscreen().cv
+    expected_svg = t.to_svg(merge_lines=merge_lines)
+    canvas.cache_fragments = True
+    t.to_svg(merge_lines=merge_lines, precision=1)
+    canvas.cache_fragments = False
+
+    svg = t.to_svg(merge_lines=merge_lines)
+
+    assert svg == expected_svg
+    assert 'x="210.123456"' in svg  # Not rounded.
+
+
+@pytest.mark.parametrize('cache_fragments', [False, True])
+def test_merge_lines(cache_fragments):
+    t = SvgTurtle(300, 200)
+    canvas = t.getscreen().cv
+    canvas.cache_fragments = cache_fragments
+    for i in range(20):
+        t.forward(5)
+        t.penup()
+        t.forward(3)
+        t.pendown()
+    t.pencolor('red')
+    t.forward(10)
+    t.to_svg(merge_lines=True)
+    t.forward(10)
+
+    svg = canvas.to_svg(verify=True, merge_lines=True)
+
+    assert svg.count('<path ') == 2
+    assert '<polyline ' not in svg
+
+
+def test_precision():
+    t = SvgTurtle(300, 200)
+    t.left(30)
+    t.forward(100)
+    t.write('Hi')
+
+    svg = t.to_svg(verify=True, precision=2)
+
+    assert 'points="150.5,100.5 237.1,50.5"' in svg
+    assert 'x="236.1" y="46.9"' in svg
+
+
+def test_relative_paths():
+    t = SvgTurtle(300, 200)
+    t.forward(10)
+    t.left(90)
+    t.forward(10)
+
+    svg = t.to_svg(verify=True,
+                   merge_lines=True,
+                   precision=1,
+                   relative_paths=True)
+
+    assert 'd="M150.5,100.5 l10,0 0,-10"' in svg
+
+
+@pytest.mark.parametrize('file_name,compress',
+                         [('example.svgz', None),
+                          ('example.svg', True)])
+def test_save_as_compressed(tmp_path, file_name, compress):
+    t = SvgTurtle(300, 200)
+    draw_sampler(t)
+    expected_svg = '<?xml version="1.0" encoding="utf-8" ?>\n' + t.to_svg()
+
+    svg_path = tmp_path / file_name
+    t.save_as(svg_path, compress=compress, compresslevel=5)
+
+    with gzip.open(svg_path, 'rt', encoding='utf-8') as svg_file:
+        assert svg_file.read() == expected_svg
+
+
+@pytest.mark.parametrize('turtle_class', [SvgTurtle, FastSvgTurtle])
+def test_to_image(turtle_class):
+    t = turtle_class(100, 100)
+    t.pencolor('red')
+    t.pensize(5)
+    t.forward(40)
+    t.fillcolor('blue')
+    t.begin_fill()
+    t.left(90)
+    t.forward(20)
+    t.left(90)
+    t.forward(20)
+    t.end_fill()
+
+    image = t.to_image()
+    big_image = t.to_image(scale=2, supersample=3)
+
+    assert image.size == (100, 100)
+    assert image.getpixel((70, 50)) == (255, 0, 0, 255)
+    assert image.getpixel((80, 40)) == (0, 0, 255, 255)
+    assert image.getpixel((0, 0)) == (0, 0, 0, 0)
+    assert big_image.size == (200, 200)
+    assert big_image.getpixel((140, 100)) == (255, 0, 0, 255)
+
+
+def test_to_image_zero_width():
+    t = SvgTurtle(100, 100)
+    t.pensize(0)
+    t.forward(40)
+    t.fillcolor('blue')
+    t.stamp()
+
+    image = t.to_image()
+
+    assert 'stroke-width="0"' in t.to_svg()
+    assert image.getpixel((70, 50)) == (0, 0, 0, 0)
+    assert image.getpixel((89, 50)) == (0, 0, 255, 255)
+
+
+def draw_square(t):
+    for _ in range(4):
+        t.forward(50)
+        t.right(90)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_render_many(tmp_path, workers):
+    square_script = '''\
+for _ in range(4):
+    t.forward(50)
+    t.right(90)
+'''
+    t = SvgTurtle(100, 100)
+    draw_square(t)
+    expected_svg = '<?xml version="1.0" encoding="utf-8" ?>\n' + t.to_svg()
+    finished = []
+
+    results = render_many(dict(function=draw_square,
+                               script=square_script,
+                               broken='t.forward(undefined_name)'),
+                          tmp_path / 'out',
+                          workers=workers,
+                          width=100,
+                          height=100,
+                          callback=finished.append)
+
+    assert [result.name for result in results] == ['function',
+                                                   'script',
+                                                   'broken']
+    assert sorted(result.name for result in finished) == ['broken',
+                                                          'function',
+                                                          'script']
+    function_result, script_result, broken_result = results
+    assert function_result.ok
+    assert function_result.path.read_text(encoding='utf-8') == expected_svg
+    assert script_result.path.read_text(encoding='utf-8') == expected_svg
+    assert not broken_result.ok
+    assert broken_result.path is None
+    assert 'NameError' in broken_result.error
+    assert not (tmp_path / 'out' / 'broken.svg').exists()
+
+
+def test_draw_async():
+    expected_svg = SvgTurtle(100, 100)
+    draw_square(expected_svg)
+    expected_svg = expected_svg.to_svg()
+    ticks = []
+
+    async def count_ticks():
+        while True:
+            ticks.append(len(ticks))
+            await asyncio.sleep(0)
+
+    async def draw_all():
+        ticker = asyncio.create_task(count_ticks())
+        turtles = await asyncio.gather(
+            draw_async(draw_square, 100, 100, steps_per_pause=2),
+            draw_async(draw_square,
+                       steps_per_pause=2,
+                       turtle=FastSvgTurtle(100, 100)))
+        ticker.cancel()
+        with pytest.raises(NameError):
+            await draw_async('t.forward(undefined_name)')
+        return turtles
+
+    t, fast_turtle = asyncio.run(draw_all())
+
+    assert t.to_svg() == expected_svg
+    assert fast_turtle.to_svg() == expected_svg
+    assert len(ticks) > 4  # Eight steps, with a pause after every two.
+    assert '_goto' not in vars(t)
+
+
+@pytest.mark.parametrize('file_name', ['drawing.svg', 'drawing.svgz'])
+def test_save_as_async(tmp_path, file_name):
+    t = SvgTurtle(100, 100)
+    for i in range(50):
+        t.forward(i)
+        t.left(37)
+    expected_path = tmp_path / ('expected_' + file_name)
+    t.save_as(expected_path, pretty=True, compress=False)
+    path = tmp_path / file_name
+
+    asyncio.run(t.save_as_async(path, pretty=True, chunk_size=100))
+
+    with gzip.open(path, 'rt') if file_name.endswith('z') else open(path) as f:
+        assert f.read() == expected_path.read_text()
+
+
+def test_render_service():
+    t = SvgTurtle(100, 100)
+    draw_square(t)
+    expected_svg = t.to_svg(precision=1)
+
+    with RenderService(workers=1, timeout=5) as service:
+        with RenderServer(('127.0.0.1', 0), service, quiet=True) as server:
+            Thread(target=server.serve_forever, daemon=True).start()
+            url = 'http://{}:{}/'.format(*server.server_address[:2])
+
+            def post(**request):
+                try:
+                    with urlopen(url + 'render',
+                                 json.dumps(request).encode()) as response:
+                        return response.status, response.read().decode()
+                except HTTPError as ex:
+                    return ex.code, json.loads(ex.read())['error']
+
+            function_response = post(function=f'{__name__}:draw_square',
+                                     width=100,
+                                     height=100,
+                                     options=dict(precision=1))
+            script_response = post(script='t.forward(undefined_name)')
+            slow_response = post(script='while True: pass', timeout=0.5)
+            bad_response = post(options=dict(precision=1))
+            bad_width_response = post(script='t.forward(1)', width=None)
+            bad_timeout_response = post(script='t.forward(1)', timeout=[1])
+            with urlopen(url + 'metrics') as response:
+                metrics = json.loads(response.read())
+            server.shutdown()
+
+    assert function_response == (200, expected_svg)
+    assert script_response[0] == 500
+    assert 'NameError' in script_response[1]
+    assert slow_response == (504, 'The job missed its deadline.')
+    assert bad_response == (400, 'Send either a script or a function.')
+    assert bad_width_response == (400,
+                                  'The width must be a positive number.')
+    assert bad_timeout_response == (400,
+                                    'The timeout must be a positive number.')
+    assert metrics['completed'] == 1
+    assert metrics['failed'] == 1
+    assert metrics['timed_out'] == 1
+    assert metrics['pending'] == 0
+    assert metrics['latency_max_seconds'] >= 0.5
+
+
+def test_render_service_restart():
+    with RenderService(workers=1, timeout=5) as service:
+        old_executor = service.executor
+        crash_result = service.render(dict(script='import os\nos._exit(1)'))
+        result = service.render(dict(script='t.forward(10)'))
+        metrics = service.metrics()
+
+    assert crash_result.error == 'A worker process died.'
+    assert service.executor is not old_executor
+    assert result.ok
+    assert metrics['worker_restarts'] == 1
+    assert metrics['failed'] == 1
+    assert metrics['completed'] == 1
+
+
+def draw_numbered_spiral(i: int) -> str:
+    t = SvgTurtle(300, 300)
+    t.getscreen().clear()
+    t.getscreen().colormode(255)
+    for step in range(300):
+        t.pencolor((i * 16 + step) % 256, step % 256, 0)
+        t.pensize(step % 5 + 1)
+        t.forward(step / 10)
+        t.left(37 + i)
+    t.write(str(i))
+    return t.to_svg()
+
+
+def test_concurrent_turtles(monkeypatch):
+    pen = object()
+    monkeypatch.setattr(Turtle, '_pen', pen)
+    screen_count = len(RawTurtle.screens)
+    expected_svgs = [draw_numbered_spiral(i) for i in range(16)]
+
+    with ThreadPoolExecutor(8) as executor:
+        svgs = list(executor.map(draw_numbered_spiral, range(16)))
+
+    assert svgs == expected_svgs
+    assert Turtle._pen is pen
+    assert len(RawTurtle.screens) == screen_count
+
+
+def draw_everything(t):
+    draw_sampler(t)
+    t.penup()
+    t.goto(-100, 50)
+    t.pendown()
+    t.color('green', (0.5, 0.2, 0.8))
+    t.begin_fill()
+    t.circle(30)
+    t.end_fill()
+    t.pensize(3)
+    for i in range(60):
+        t.forward(i)
+        t.left(59)
+    t.shape('turtle')
+    t.shapesize(2)
+    t.stamp()
+    t.setheading(45)
+    t.backward(20)
+    t.dot()
+    t.write('Done', align='right', font=('Courier', 12, 'bold'))
+
+
+def test_fast_turtle_matches():
+    t = SvgTurtle(300, 200)
+    draw_everything(t)
+    expected_svg = t.to_svg()
+    fast_turtle = FastSvgTurtle(300, 200)
+
+    draw_everything(fast_turtle)
+    svg = fast_turtle.to_svg()
+
+    assert svg == expected_svg
+    assert fast_turtle.pos() == t.pos()
+    assert fast_turtle.heading() == t.heading()
+    assert fast_turtle.pen() == t.pen()
+
+
+def test_fast_turtle_clear():
+    t = FastSvgTurtle(100, 100)
+    t.forward(10)
+    stamp_ids = [t.stamp(), t.stamp(), t.stamp()]
+    t.clearstamp(stamp_ids[1])
+    t.clearstamps(-1)
+    canvas = t.getscreen().cv
+
+    assert canvas.type(stamp_ids[0]) == 'polygon'
+    assert canvas.type(stamp_ids[1]) is None
+    assert canvas.type(stamp_ids[2]) is None
+
+    t.clear()
+
+    assert '<polyline' not in t.to_svg()
+    assert canvas.type(stamp_ids[0]) is None
+    with pytest.raises(NotImplementedError):
+        t.undo()
+
+
+def test_cull():
+    t = SvgTurtle(100, 100)
+    t.width(4)
+    t.forward(20)
+    t.penup()
+    t.goto(500, 0)
+    t.pendown()
+    t.forward(20)  # Far off the right edge.
+    t.penup()
+    t.goto(57, 0)
+    t.pendown()
+    t.forward(20)  # Starts off the edge, but it's wide enough to show.
+
+    full_svg = t.to_svg()
+    culled_svg = t.to_svg(cull=True, verify=True)
+
+    assert full_svg.count('<polyline') == 3
+    assert culled_svg.count('<polyline') == 2
+    assert '550.5,50.5' not in culled_svg
+
+
+def test_find_items():
+    t = SvgTurtle(100, 100)
+    t.forward(20)
+    t.penup()
+    t.goto(100, 100)
+    t.pendown()
+    t.goto(100, 150)
+    canvas = t.getscreen().cv
+    first_line, second_line = [item
+                               for item in canvas.find_all()
+                               if canvas.bbox(item)[2] > 0]
+
+    assert canvas.bbox(first_line) == (0, 0, 20, 0)
+    assert canvas.bbox(first_line, second_line) == (0, -150, 100, 0)
+    assert canvas.find_overlapping(90, -200, 110, -120) == (second_line,)
+    assert canvas.find_enclosed(90, -200, 110, -120) == ()
+    # The turtle's empty items at the origin are enclosed too.
+    assert canvas.find_enclosed(-1, -1, 21, 1)[-1] == first_line
+
+    t.forward(100)  # The index keeps up with changes.
+    canvas.delete(first_line)
+
+    assert canvas.find_overlapping(190, -160, 210, -140) == (second_line,)
+    assert first_line not in canvas.find_overlapping(-1, -1, 21, 1)
+
+
+def test_find_overlapping_huge_item():
+    canvas = canvas_module.Canvas()
+    huge_line = canvas.create_line(0, 0, 50000, 50000, fill='', width=1)
+    small_line = canvas.create_line(0, 0, 10, 10, fill='', width=1)
+
+    assert canvas.find_overlapping(5, 5, 6, 6) == (huge_line, small_line)
+    assert canvas.find_overlapping(40000, 40000, 40001, 40001) == (huge_line,)
+    assert canvas.find_overlapping(-5, 20, -1, 30) == ()
+    assert len(canvas.spatial_index.cells) == 1  # Only the small line.
+
+    canvas.coords(huge_line, 0, 0, 1, 1)
+
+    assert canvas.find_overlapping(5, 5, 6, 6) == (small_line,)
+    assert canvas.spatial_index.large_items == set()
+
+
+@pytest.mark.parametrize('turtle_class', [SvgTurtle, FastSvgTurtle])
+def test_stamp_symbols(turtle_class):
+    t = turtle_class(100, 100)
+    t.shape('turtle')
+    for _ in range(3):
+        t.stamp()
+        t.forward(20)
+        t.left(40)
+    t.shape('square')
+    square_id = t.stamp()
+    t.shape('arrow')
+    t.clearstamp(t.stamp())
+
+    svg = t.to_svg(stamp_symbols=True, verify=True)
+
+    assert svg.count('<symbol') == 2  # The arrow isn't used any more.
+    assert svg.count('<use') == 4
+    assert svg.count('xlink:href="#shape0"') == 3
+    assert '<polygon points="0,16 -2,14' in svg
+    t.clearstamp(square_id)
+    assert t.to_svg(stamp_symbols=True).count('<symbol') == 1
+    assert '<use' not in t.to_svg()
+    canvas = t.getscreen().cv
+    assert list(canvas.symbol_points) == ['shape0']
+    t.clearstamps()
+    assert canvas.symbol_points == canvas.symbol_ids == {}
+
+
+@pytest.mark.parametrize('pretty', [False, True])
+def test_group_styles(pretty):
+    t = SvgTurtle(100, 100)
+    t.write('a')
+    t.write('b')
+    t.stamp()
+    t.forward(20)
+    t.stamp()
+    t.pencolor('red')
+    t.forward(20)
+
+    svg = t.to_svg(pretty=pretty, group_styles=True, verify=True)
+    compact_svg = svg.replace('\n', '').replace('  ', '')
+
+    assert svg.count('clip-path') == 1
+    assert svg.count('<g') == 3
+    assert '<g fill="black" fill-rule="evenodd" stroke="black"' in svg
+    assert '<text x="' in svg
+    assert compact_svg.endswith(
+        '<polyline fill="none" points="70.5,50.5 90.5,50.5" stroke="#ff0000" '
+        'stroke-linecap="round" stroke-width="1"' +
+        ('/>' if pretty else ' />') + '</g></svg>')
+
+
+def test_clearstamps_undo():
+    # Both are SvgTurtles, but one clears stamps with RawTurtle's method.
+    svg_turtle, raw_turtle = SvgTurtle(), SvgTurtle()
+    for t in (svg_turtle, raw_turtle):
+        t.setundobuffer(6)
+        for _ in range(4):
+            t.stamp()
+            t.forward(10)
+    svg_turtle.clearstamps(-3)
+    RawTurtle.clearstamps(raw_turtle, -3)
+    buffers = []
+    for t in (svg_turtle, raw_turtle):
+        t.undo()
+        buffer = t.undobuffer
+        buffers.append(buffer.buffer[buffer.ptr+1:] +
+                       buffer.buffer[:buffer.ptr+1])
+
+    assert svg_turtle.to_svg() == raw_turtle.to_svg()
+    assert buffers[0] == buffers[1]
+
+
+@pytest.mark.parametrize('turtle_class', [SvgTurtle, FastSvgTurtle])
+def test_native_arcs(turtle_class):
+    t = turtle_class(100, 100, native_arcs=True)
+    t.begin_fill()
+    t.circle(20)
+    t.end_fill()
+    t.circle(-10, 90)
+    t.dot(6, 'red')
+    t.forward(5)
+    t.circle(10, steps=4)
+
+    svg = t.to_svg(precision=2, verify=True)
+
+    assert ('<circle clip-path="url(#border_clip)" cx="50.5" cy="30.5" '
+            'fill="none" r="20" stroke="black" stroke-width="1" />') in svg
+    assert ' d="M50.5,50.5 A10,10 0 0,1 60.5,60.5" ' in svg
+    assert ('<circle clip-path="url(#border_clip)" cx="60.5" cy="60.5" '
+            'fill="#ff0000" r="3" />') in svg
+    assert svg.count('<polyline') == 1  # The line, then the square.
+    assert svg.count('<polygon') == 1  # The fill still has all the steps.
+    plain = turtle_class(100, 100)
+    plain.circle(-10, 90)
+    assert plain.position() == pytest.approx((10, -10))
+    assert t.position() == pytest.approx((10, -15))
+
+
+def test_native_arcs_undo():
+    t = SvgTurtle(100, 100, native_arcs=True)
+    t.forward(10)
+    expected_svg = t.to_svg()
+    t.circle(20, 120)
+    t.dot()
+    t.undo()
+    t.undo()
+
+    assert t.to_svg() == expected_svg
+    assert t.position() == (10, 0)
+
+
+@pytest.mark.parametrize('turtle_class', [SvgTurtle, FastSvgTurtle])
+def test_stats(turtle_class):
+    reports = []
+    t = turtle_class(100, 100)
+    assert t.get_stats() == {}
+
+    t.enable_stats(reports.append)
+    for _ in range(10):
+        t.forward(5)
+        t.left(30)
+    t.write('Hello')
+    svg = t.to_svg()
+    stats = t.get_stats()
+    t.disable_stats()
+    t.forward(5)
+
+    assert reports == [stats]
+    assert stats['moves'] == stats['turns'] == 10
+    assert stats['items_created'] == 1  # Just the text.
+    assert stats['coord_updates'] > 0
+    assert stats['svg_characters'] == len(svg)
+    assert stats['exports'] == 1
+    for phase in ('motion', 'canvas', 'elements', 'serialisation', 'export'):
+        assert stats[phase + '_seconds'] > 0
+    assert t.get_stats() == {}
+    assert '_goto' not in vars(t)
+    assert 'coords' not in vars(t.getscreen().cv)
+
+
+def test_lazy_imports():
+    script = '''\
+import sys
+import svg_turtle
+slow_modules = ['turtle', 'svgwrite', 'IPython', 'numpy', 'svg_turtle.colors']
+print(sorted(name for name in slow_modules if name in sys.modules))
+svg_turtle.SvgTurtle
+print('turtle' in sys.modules, 'svg_turtle.colors' in sys.modules)
+'''
+    result = subprocess.run([sys.executable, '-c', script],
+                            stdout=subprocess.PIPE,
+                            check=True,
+                            text=True)
+
+    assert result.stdout.splitlines() == ['[]', 'True False']
+
+
+def test_star_import():
+    names = {}
+
+    exec('from svg_turtle import *', names)
+
+    assert names['SvgTurtle'] is SvgTurtle
+    assert names['FastSvgTurtle'] is FastSvgTurtle
+    assert names['TurtleGraphicsError'] is TurtleGraphicsError
+    assert names['IPythonTurtle'].__name__ == 'IPythonTurtle'